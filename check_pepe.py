@@ -1,4 +1,11 @@
 import ccxt
+import json
+import os
+import time
+
+CACHE_FILE = os.path.join('.cache', 'binance_swap_markets.json')
+CACHE_TTL = 3600  # seconds
+
 print("Checking Binance Futures symbols...")
 exchange = ccxt.binance({
     'options': {'defaultType': 'swap'},
@@ -7,14 +14,24 @@ exchange = ccxt.binance({
         'https': 'http://127.0.0.1:33210'
     }
 })
+
+
+def load_symbols():
+    # Reuse the symbol list from a recent run instead of re-downloading every market
+    if os.path.exists(CACHE_FILE) and time.time() - os.path.getmtime(CACHE_FILE) < CACHE_TTL:
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+
+    symbols = list(exchange.load_markets().keys())
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, 'w') as f:
+        json.dump(symbols, f)
+    return symbols
+
+
 try:
-    markets = exchange.load_markets()
-    found = False
-    for symbol in markets:
-        if 'PEPE' in symbol:
-            print(f"Found: {symbol}")
-            found = True
-    if not found:
-        print("No PEPE found in swap markets")
+    matches = [symbol for symbol in load_symbols() if 'PEPE' in symbol]
+    # Single write instead of one print per match
+    print('\n'.join(f"Found: {symbol}" for symbol in matches) or "No PEPE found in swap markets")
 except Exception as e:
     print(f"Error: {e}")
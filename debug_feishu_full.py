@@ -1,14 +1,21 @@
 
 import os
 import sys
-import json
 import requests
-from dotenv import load_dotenv
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
 
 # Add src to path
 sys.path.append(os.getcwd())
 
-load_dotenv()
+from src.utils.env import load_env
+
+load_env()
+
+# One keep-alive session so the card request reuses the text request's TLS connection
+session = requests.Session()
+session.headers.update({'Content-Type': 'application/json'})
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
 
 def debug_feishu():
     url = os.getenv("FEISHU_WEBHOOK_URL")
@@ -19,16 +26,15 @@ def debug_feishu():
         return
 
     print("\n1. Testing Simple Text Message...")
-    headers = {'Content-Type': 'application/json'}
     data = {
         "msg_type": "text",
         "content": {
-            "text": "🔍 Debug Test: Simple Text Message\nTimestamp: " + os.popen("date").read().strip()
+            "text": f"🔍 Debug Test: Simple Text Message\nTimestamp: {datetime.now(timezone.utc).isoformat(timespec='seconds')}"
         }
     }
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data), timeout=10)
+        response = session.post(url, json=data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response Headers: {response.headers}")
         print(f"Response Body: {response.text}")
@@ -70,7 +76,7 @@ def debug_feishu():
     }
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(card_data), timeout=10)
+        response = session.post(url, json=card_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response Body: {response.text}")
     except Exception as e:
@@ -1,5 +1,7 @@
 
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 
 replacements = {
     'bg-[#161A1E]': 'bg-gray-50 dark:bg-[#161A1E]',
@@ -29,20 +31,39 @@ replacements = {
     'hover:text-[#F0B90B]': 'hover:text-yellow-600 dark:hover:text-[#F0B90B]',
 }
 
+# Longest key wins, e.g. bg-[#2B3139]/50 over bg-[#2B3139]
+PATTERN = re.compile('|'.join(re.escape(k) for k in sorted(replacements, key=len, reverse=True)))
+
 target_dir = 'components'
 
-for root, dirs, files in os.walk(target_dir):
-    for file in files:
-        if file.endswith('.tsx'):
-            file_path = os.path.join(root, file)
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            original_content = content
-            for old, new in replacements.items():
-                content = content.replace(old, new)
-            
-            if content != original_content:
-                with open(file_path, 'w') as f:
-                    f.write(content)
+
+def process_file(file_path):
+    with open(file_path, 'r') as f:
+        content = f.read()
+
+    if PATTERN.search(content) is None:
+        return None
+
+    content = PATTERN.sub(lambda m: replacements[m.group(0)], content)
+
+    # Write to a sibling temp file and swap it in so an interrupted run never
+    # leaves a half-written component behind.
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+if __name__ == '__main__':
+    paths = [
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(target_dir)
+        for file in files
+        if file.endswith('.tsx')
+    ]
+
+    with ProcessPoolExecutor() as ex:
+        for file_path in ex.map(process_file, paths, chunksize=16):
+            if file_path:
                 print(f"Updated {file_path}")
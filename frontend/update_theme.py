@@ -1,5 +1,6 @@
 
 import os
+import re
 
 replacements = {
     'bg-[#161A1E]': 'bg-gray-50 dark:bg-[#161A1E]',
@@ -14,13 +15,14 @@ replacements = {
     'text-[#F0B90B]': 'text-yellow-600 dark:text-[#F0B90B]', # Adjust yellow for light mode visibility
 }
 
+PATTERN = re.compile('|'.join(re.escape(k) for k in sorted(replacements, key=len, reverse=True)))
+
 file_path = 'app/page.tsx'
 
 with open(file_path, 'r') as f:
     content = f.read()
 
-for old, new in replacements.items():
-    content = content.replace(old, new)
+content = PATTERN.sub(lambda m: replacements[m.group(0)], content)
 
 with open(file_path, 'w') as f:
     f.write(content)
@@ -1,5 +1,6 @@
 
 import os
+import re
 
 replacements = {
     'bg-[#2B3139]/20': 'bg-gray-200 dark:bg-[#2B3139]/20',
@@ -17,13 +18,14 @@ replacements = {
     'accent-[#F0B90B]': 'accent-yellow-600 dark:accent-[#F0B90B]',
 }
 
+PATTERN = re.compile('|'.join(re.escape(k) for k in sorted(replacements, key=len, reverse=True)))
+
 file_path = 'app/page.tsx'
 
 with open(file_path, 'r') as f:
     content = f.read()
 
-for old, new in replacements.items():
-    content = content.replace(old, new)
+content = PATTERN.sub(lambda m: replacements[m.group(0)], content)
 
 with open(file_path, 'w') as f:
     f.write(content)
@@ -1,17 +1,17 @@
 import os
 import sys
-import json
+import asyncio
 import logging
-import pandas as pd
-from dotenv import load_dotenv
-
-# Load env vars
-load_dotenv()
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
-from src.trader.real_trader import RealTrader
+from src.utils.env import load_env, load_json_config
+
+# Load env vars
+load_env()
+
+from src.trader.singleton import get_trader
 from src.data.collector import CryptoDataCollector, FuturesDataCollector
 from src.strategies.trend_ml_strategy import TrendMLStrategy
 from src.models.predictor import PricePredictor
@@ -23,13 +23,15 @@ logger = logging.getLogger("ManualTrade")
 TRADER_CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'trader_config.json')
 
 def load_config():
-    if os.path.exists(TRADER_CONFIG_FILE):
-        try:
-            with open(TRADER_CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load config: {e}")
-    return {}
+    return load_json_config(TRADER_CONFIG_FILE)
+
+async def fetch_market_data(collector, futures_collector):
+    # The collectors are blocking (requests), so overlap them on worker threads
+    return await asyncio.gather(
+        asyncio.to_thread(collector.fetch_ohlcv, timeframe="1m", limit=500),
+        asyncio.to_thread(futures_collector.fetch_funding_rate_history),
+        asyncio.to_thread(futures_collector.fetch_open_interest_history, period="5m", limit=500)
+    )
 
 def main():
     logger.info("Starting Manual Trade Script...")
@@ -43,7 +45,7 @@ def main():
     symbol = "BTC/USDT:USDT"
     leverage = 20 # Force 20x as per requirement
     
-    trader = RealTrader(
+    trader = get_trader(
         symbol=symbol,
         leverage=leverage,
         api_key=api_key,
@@ -75,19 +77,11 @@ def main():
         
     futures_collector = FuturesDataCollector(symbol="BTCUSDT")
     
-    # Fetch Data
-    # Fetch 1m data
-    df = collector.fetch_ohlcv(timeframe="1m", limit=500)
+    # Fetch Data (1m OHLCV, funding, OI concurrently)
+    df, funding, oi_hist = asyncio.run(fetch_market_data(collector, futures_collector))
     if df is None or len(df) == 0:
         logger.error("Failed to fetch OHLCV data.")
         return
-        
-    # Convert list to DataFrame if needed (fetch_ohlcv might return list)
-    if isinstance(df, list):
-         df = pd.DataFrame(df)
-         
-    funding = futures_collector.fetch_funding_rate_history()
-    oi_hist = futures_collector.fetch_open_interest_history(period="5m", limit=500)
     
     # Predictor
     logger.info("Running ML Prediction...")
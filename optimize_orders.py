@@ -1,28 +1,119 @@
 import sys
 import os
 import logging
-import json
-import time
-from dotenv import load_dotenv
+import asyncio
+from decimal import Decimal
+
+import ccxt.async_support as ccxt_async
 
 # Add src to path
 sys.path.append(os.getcwd())
 
-from src.trader.real_trader import RealTrader
+from src.trader.singleton import get_trader
+from src.utils.env import load_env, load_json_config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("OrderOptimizer")
 
 def load_config():
+    return load_json_config('trader_config.json')
+
+# symbol -> rounding function, built once per symbol from the market tick size
+_price_rounders = {}
+
+def get_price_rounder(exchange, symbol):
+    if symbol not in _price_rounders:
+        tick = exchange.markets[symbol]['precision']['price']
+        decimals = max(0, -Decimal(str(tick)).normalize().as_tuple().exponent)
+        # Nearest tick, same as price_to_precision's default ROUND mode
+        _price_rounders[symbol] = lambda p: round(round(p / tick) * tick, decimals)
+    return _price_rounders[symbol]
+
+async def reoptimize(exchange, symbol, pos):
+    amount = float(pos['amount'])
+    entry_price = float(pos['entry_price'])
+    side = pos['side']
+    pnl_pct = pos['pnl_pct']
+
+    logger.info(f"Processing {symbol}: {side} {amount} @ {entry_price} (PnL: {pnl_pct:.2f}%)")
+
+    # 1. Cancel existing orders
+    try:
+        logger.info(f"  Cancelling existing orders for {symbol}...")
+        await exchange.cancel_all_orders(symbol)
+    except Exception as e:
+        logger.error(f"  Failed to cancel orders for {symbol}: {e}")
+        return
+
+    # 2. Calculate New SL/TP (Optimization)
+    # Using "Normal" mode defaults or Config
+    # SL: 2% (0.02) - Conservative for now
+    # TP: 3% (0.03)
+
+    sl_pct = 0.02
+    tp_pct = 0.03
+
+    if side == 'long':
+        sl_price = entry_price * (1 - sl_pct)
+        tp_price = entry_price * (1 + tp_pct)
+        sl_side = 'sell'
+    else:
+        sl_price = entry_price * (1 + sl_pct)
+        tp_price = entry_price * (1 - tp_pct)
+        sl_side = 'buy'
+
+    # Precision
+    round_px = get_price_rounder(exchange, symbol)
+    sl_price = round_px(sl_price)
+    tp_price = round_px(tp_price)
+
+    logger.info(f"  Placing New SL: {sl_price}, TP: {tp_price} for {symbol}")
+
+    # 3. Place New Orders (ReduceOnly) - SL and TP are independent, send together
+    sl_result, tp_result = await asyncio.gather(
+        exchange.create_order(symbol, 'STOP_MARKET', sl_side, amount, params={
+            'stopPrice': sl_price,
+            'reduceOnly': True
+        }),
+        exchange.create_order(symbol, 'TAKE_PROFIT_MARKET', sl_side, amount, params={
+            'stopPrice': tp_price,
+            'reduceOnly': True
+        }),
+        return_exceptions=True
+    )
+
+    for label, result in (("SL", sl_result), ("TP", tp_result)):
+        if isinstance(result, Exception):
+            logger.error(f"  ❌ Failed to place {label} order for {symbol}: {result}")
+        else:
+            logger.info(f"  ✅ {label} Order Placed for {symbol}")
+
+async def reoptimize_all(positions, api_key, api_secret, proxy_url):
+    # One async client (single keep-alive aiohttp session) shared by all symbols
+    options = {
+        'apiKey': api_key,
+        'secret': api_secret,
+        'options': {
+            'defaultType': 'swap',
+            'adjustForTimeDifference': True,
+            'recvWindow': 10000,
+        },
+        'enableRateLimit': True,
+        'timeout': 60000,
+    }
+    if proxy_url:
+        options['aiohttp_proxy'] = proxy_url
+
+    exchange = ccxt_async.binanceusdm(options)
     try:
-        with open('trader_config.json', 'r') as f:
-            return json.load(f)
-    except:
-        return {}
+        await exchange.load_markets()
+        await asyncio.gather(*(reoptimize(exchange, symbol, pos) for symbol, pos in positions.items()))
+    finally:
+        await exchange.close()
 
 def main():
-    load_dotenv()
+    load_env()
     config = load_config()
     
     # Force real mode params for this script
@@ -32,7 +123,7 @@ def main():
     
     logger.info(f"Initializing RealTrader with proxy {proxy_url}...")
     
-    trader = RealTrader(
+    trader = get_trader(
         symbol="BTC/USDT:USDT", # Default, but we'll scan all
         api_key=api_key,
         api_secret=api_secret,
@@ -51,67 +142,8 @@ def main():
         return
 
     logger.info(f"Found {len(positions)} active positions.")
-    
-    for symbol, pos in positions.items():
-        amount = float(pos['amount'])
-        entry_price = float(pos['entry_price'])
-        side = pos['side']
-        pnl_pct = pos['pnl_pct']
-        
-        logger.info(f"Processing {symbol}: {side} {amount} @ {entry_price} (PnL: {pnl_pct:.2f}%)")
-        
-        # 1. Cancel existing orders
-        try:
-            logger.info(f"  Cancelling existing orders for {symbol}...")
-            trader.exchange.cancel_all_orders(symbol)
-        except Exception as e:
-            logger.error(f"  Failed to cancel orders: {e}")
-            continue
-            
-        # 2. Calculate New SL/TP (Optimization)
-        # Using "Normal" mode defaults or Config
-        # SL: 2% (0.02) - Conservative for now
-        # TP: 3% (0.03)
-        
-        sl_pct = 0.02
-        tp_pct = 0.03
-        
-        sl_price = 0.0
-        tp_price = 0.0
-        
-        if side == 'long':
-            sl_price = entry_price * (1 - sl_pct)
-            tp_price = entry_price * (1 + tp_pct)
-            sl_side = 'sell'
-        else:
-            sl_price = entry_price * (1 + sl_pct)
-            tp_price = entry_price * (1 - tp_pct)
-            sl_side = 'buy'
-            
-        # Precision
-        sl_price = float(trader.exchange.price_to_precision(symbol, sl_price))
-        tp_price = float(trader.exchange.price_to_precision(symbol, tp_price))
-        
-        logger.info(f"  Placing New SL: {sl_price}, TP: {tp_price}")
-        
-        # 3. Place New Orders (ReduceOnly)
-        try:
-            # Stop Loss
-            trader.exchange.create_order(symbol, 'STOP_MARKET', sl_side, amount, params={
-                'stopPrice': sl_price,
-                'reduceOnly': True
-            })
-            logger.info("  ✅ SL Order Placed")
-            
-            # Take Profit
-            trader.exchange.create_order(symbol, 'TAKE_PROFIT_MARKET', sl_side, amount, params={
-                'stopPrice': tp_price,
-                'reduceOnly': True
-            })
-            logger.info("  ✅ TP Order Placed")
-            
-        except Exception as e:
-            logger.error(f"  ❌ Failed to place orders: {e}")
+
+    asyncio.run(reoptimize_all(positions, api_key, api_secret, proxy_url))
 
     logger.info("Optimization complete.")
 
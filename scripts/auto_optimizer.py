@@ -5,9 +5,11 @@ import logging
 import pandas as pd
 import numpy as np
 import joblib
-import json
+import orjson
 import random
 import signal
+import optuna
+import xgboost as xgb
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 
@@ -31,6 +33,9 @@ logger = logging.getLogger(__name__)
 DATA_DIR = "data/raw"
 MODELS_DIR = "src/models/saved_models"
 METRICS_FILE = os.path.join(MODELS_DIR, "multicoin_metrics.json")
+FEATURE_CACHE_DIR = "data/cache"
+# Feature cache is invalidated whenever the feature code changes
+FEATURES_SOURCE = os.path.join("src", "models", "features.py")
 TIMEFRAME = '1m'
 HORIZONS = [10] # Focus on 10m first as it's the primary signal
 # 14 Symbols Scope
@@ -43,14 +48,49 @@ TARGET_SYMBOLS = [
 MIN_ACCURACY = 0.55
 MIN_PRECISION = 0.52
 MAX_TRIALS_PER_RUN = 10  # More trials per optimization run
+TRIALS_TIMEOUT = 1800  # Seconds per symbol search
+PRUNE_WARMUP_ROUNDS = 20  # Boosting rounds before a trial may be pruned
+# Studies persist across cycles so TPE keeps learning from earlier runs
+STUDY_STORAGE = "sqlite:///data/auto_optimizer_studies.db"
 
-# Ensure models dir exists
+# Ensure models and study dirs exist
 os.makedirs(MODELS_DIR, exist_ok=True)
+os.makedirs("data", exist_ok=True)
+os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+
+def _cuda_available():
+    """Probe once whether this XGBoost build can actually train on a CUDA device."""
+    if not xgb.build_info().get('USE_CUDA'):
+        return False
+    try:
+        XGBClassifier(n_estimators=1, tree_method='hist', device='cuda').fit(
+            np.zeros((2, 1), dtype=np.float32), np.array([0, 1])
+        )
+        return True
+    except Exception:
+        return False
+
+USE_CUDA = _cuda_available()
+
+class PruningCallback(xgb.callback.TrainingCallback):
+    """Report validation logloss to Optuna each round and abort hopeless trials."""
+
+    def __init__(self, trial):
+        self.trial = trial
+
+    def after_iteration(self, model, epoch, evals_log):
+        logloss = evals_log['validation_0']['logloss'][-1]
+        # Negated so it points the same way as the maximized study score
+        self.trial.report(-logloss, step=epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Pruned at round {epoch}")
+        return False
 
 class AutoOptimizer:
     def __init__(self):
         self.running = True
         self.metrics = self.load_metrics()
+        self._metrics_dirty = False
         signal.signal(signal.SIGINT, self.stop)
         signal.signal(signal.SIGTERM, self.stop)
 
@@ -61,18 +101,29 @@ class AutoOptimizer:
     def load_metrics(self):
         if os.path.exists(METRICS_FILE):
             try:
-                with open(METRICS_FILE, 'r') as f:
-                    return json.load(f)
+                with open(METRICS_FILE, 'rb') as f:
+                    return orjson.loads(f.read())
             except Exception as e:
                 logger.error(f"Failed to load metrics: {e}")
                 return {}
         return {}
 
     def save_metrics(self):
-        with open(METRICS_FILE, 'w') as f:
-            json.dump(self.metrics, f, indent=4)
+        # Atomic save: write + fsync a temp file, then swap it in
+        tmp_path = f"{METRICS_FILE}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(self.metrics, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, METRICS_FILE)
+        self._metrics_dirty = False
 
-    def load_data(self, symbol):
+    def flush_metrics(self):
+        """Persist metrics if any model was saved since the last flush."""
+        if self._metrics_dirty:
+            self.save_metrics()
+
+    def get_data_path(self, symbol):
         filename = f"{symbol}USDT_{TIMEFRAME}.csv"
         filepath = os.path.join(DATA_DIR, filename)
         
@@ -82,38 +133,79 @@ class AutoOptimizer:
             filepath = os.path.join(DATA_DIR, filename)
             
         if not os.path.exists(filepath):
+            return None
+        return filepath
+
+    def load_data(self, symbol):
+        filepath = self.get_data_path(symbol)
+        if filepath is None:
             logger.warning(f"[{symbol}] Data file not found.")
             return pd.DataFrame()
         
         try:
-            df = pd.read_csv(filepath)
+            # Multithreaded Arrow parser; columns stay NumPy-backed for FeatureEngineer
+            df = pd.read_csv(filepath, engine='pyarrow')
             if 'datetime' not in df.columns and 'timestamp' in df.columns:
-                df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+                df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms', cache=True)
             elif 'datetime' in df.columns:
-                df['datetime'] = pd.to_datetime(df['datetime'])
+                df['datetime'] = pd.to_datetime(df['datetime'], cache=True)
             return df
         except Exception as e:
             logger.error(f"[{symbol}] Error reading CSV: {e}")
             return pd.DataFrame()
 
-    def get_random_params(self):
-        """Generate wider range of random hyperparameters"""
+    def load_features(self, symbol):
+        """
+        Load the feature-engineered frame, reusing the parquet cache while it is
+        newer than both the raw CSV and the FeatureEngineer source.
+        """
+        filepath = self.get_data_path(symbol)
+        if filepath is None:
+            logger.warning(f"[{symbol}] Data file not found.")
+            return pd.DataFrame()
+
+        cache_path = os.path.join(FEATURE_CACHE_DIR, f"{symbol}_{TIMEFRAME}_feat.parquet")
+        if os.path.exists(cache_path):
+            cache_mtime = os.path.getmtime(cache_path)
+            if cache_mtime > os.path.getmtime(filepath) and cache_mtime > os.path.getmtime(FEATURES_SOURCE):
+                try:
+                    return pd.read_parquet(cache_path)
+                except Exception as e:
+                    logger.warning(f"[{symbol}] Feature cache unreadable, rebuilding: {e}")
+
+        df = self.load_data(symbol)
+        if df.empty or len(df) < 1000:
+            return df
+
+        df = FeatureEngineer.generate_features(df)
+        df = df.dropna()
+
+        try:
+            df.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            logger.warning(f"[{symbol}] Failed to write feature cache: {e}")
+        return df
+
+    def suggest_params(self, trial):
+        """Sample hyperparameters from the same ranges the random search used"""
         return {
-            'n_estimators': random.choice([100, 300, 500, 800, 1000]),
-            'max_depth': random.choice([3, 4, 5, 6, 8, 10]),
-            'learning_rate': random.uniform(0.005, 0.3),
-            'subsample': random.uniform(0.5, 1.0),
-            'colsample_bytree': random.uniform(0.5, 1.0),
-            'gamma': random.uniform(0, 5),
-            'min_child_weight': random.randint(1, 10),
+            'n_estimators': trial.suggest_categorical('n_estimators', [100, 300, 500, 800, 1000]),
+            'max_depth': trial.suggest_categorical('max_depth', [3, 4, 5, 6, 8, 10]),
+            'learning_rate': trial.suggest_float('learning_rate', 0.005, 0.3, log=True),
+            'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+            'colsample_bytree': trial.suggest_float('colsample_bytree', 0.5, 1.0),
+            'gamma': trial.suggest_float('gamma', 0, 5),
+            'min_child_weight': trial.suggest_int('min_child_weight', 1, 10),
             'random_state': random.randint(0, 10000),
-            'n_jobs': 2, # Reduce threads to save memory
-            'eval_metric': 'logloss'
+            'tree_method': 'hist',
+            'eval_metric': 'logloss',
+            **({'device': 'cuda'} if USE_CUDA else {'n_jobs': 2}) # CPU: reduce threads to save memory
         }
 
     def evaluate_model(self, model, X_test, y_test):
-        y_pred = model.predict(X_test)
+        # One inference pass; hard labels derived from the probabilities
         y_prob = model.predict_proba(X_test)[:, 1]
+        y_pred = (y_prob >= 0.5).astype(np.int8)
         
         acc = accuracy_score(y_test, y_pred)
         prec = precision_score(y_test, y_pred, zero_division=0)
@@ -132,21 +224,17 @@ class AutoOptimizer:
     def optimize_symbol(self, symbol, horizon=10):
         logger.info(f"[{symbol}] Starting optimization for {horizon}m horizon...")
         
-        # 1. Load Data
-        df = self.load_data(symbol)
-        if df.empty or len(df) < 1000:
-            logger.warning(f"[{symbol}] Insufficient data. Skipping.")
-            return False
-
-        # 2. Feature Engineering
-        # logger.info(f"[{symbol}] Generating features...")
+        # 1. Load Data + 2. Feature Engineering (cached between cycles)
         try:
-            df = FeatureEngineer.generate_features(df)
-            df = df.dropna()
+            df = self.load_features(symbol)
         except Exception as e:
             logger.error(f"[{symbol}] Feature engineering failed: {e}")
             return False
 
+        if df.empty or len(df) < 1000:
+            logger.warning(f"[{symbol}] Insufficient data. Skipping.")
+            return False
+
         # 3. Prepare Data
         future_close = df['close'].shift(-horizon)
         df[f'target_{horizon}m'] = (future_close > df['close'] * 1.001).astype(int)
@@ -163,10 +251,12 @@ class AutoOptimizer:
         train_df = data_valid.iloc[:split_idx]
         test_df = data_valid.iloc[split_idx:]
         
-        X_train = train_df[features]
-        y_train = train_df[f'target_{horizon}m']
-        X_test = test_df[features]
-        y_test = test_df[f'target_{horizon}m']
+        # Materialize the matrices once (float32) so the trial loop hands XGBoost
+        # ready arrays instead of re-converting DataFrames on every fit
+        X_train = train_df[features].to_numpy(dtype=np.float32)
+        y_train = train_df[f'target_{horizon}m'].to_numpy(dtype=np.int8)
+        X_test = test_df[features].to_numpy(dtype=np.float32)
+        y_test = test_df[f'target_{horizon}m'].to_numpy(dtype=np.int8)
 
         # Calculate scale_pos_weight for imbalanced classes
         num_pos = np.sum(y_train == 1)
@@ -177,6 +267,9 @@ class AutoOptimizer:
         
         logger.info(f"[{symbol}] Class balance: Pos={num_pos}, Neg={num_neg}, Scale={scale_pos_weight:.2f}")
 
+        # Class reweighting as per-row weights, built once and shared by every trial
+        sample_weight = np.where(y_train == 1, scale_pos_weight, 1.0).astype(np.float32)
+
         # Check current best
         current_metrics = self.metrics.get(f"{symbol}USDT", {}).get(f"{horizon}m", {})
         best_acc = current_metrics.get("accuracy", 0)
@@ -184,42 +277,61 @@ class AutoOptimizer:
         
         logger.info(f"[{symbol}] Current Best: Acc={best_acc}, Prec={best_prec}")
         
-        best_model_run = None
-        best_metrics_run = None
-        best_score_run = -1
+        best_run = {"model": None, "metrics": None, "score": -1}
+
+        def objective(trial):
+            params = self.suggest_params(trial)
 
-        # Optimization Loop
-        for trial in range(MAX_TRIALS_PER_RUN):
-            if not self.running: break
-            
-            params = self.get_random_params()
-            # Inject scale_pos_weight to handle imbalance
-            params['scale_pos_weight'] = scale_pos_weight
-            
             try:
-                model = XGBClassifier(**params)
-                model.fit(X_train, y_train)
+                model = XGBClassifier(**params, callbacks=[PruningCallback(trial)])
+                model.fit(X_train, y_train, sample_weight=sample_weight, eval_set=[(X_test, y_test)], verbose=False)
                 metrics = self.evaluate_model(model, X_test, y_test)
-                
-                # Custom Score: Heavily penalize low precision
-                score = (metrics['accuracy'] * 0.4) + (metrics['precision'] * 0.6)
-                
-                # Check if meets minimum standards
-                if metrics['accuracy'] < MIN_ACCURACY or metrics['precision'] < MIN_PRECISION:
-                    score = score * 0.5 # Penalty
-                
-                if score > best_score_run:
-                    best_score_run = score
-                    best_model_run = model
-                    best_metrics_run = metrics
-                    
-                # Early exit if excellent model found
-                if metrics['accuracy'] > 0.60 and metrics['precision'] > 0.55:
-                    logger.info(f"[{symbol}] 🌟 Excellent model found! Acc={metrics['accuracy']}, Prec={metrics['precision']}")
-                    break
-                    
+            except optuna.TrialPruned:
+                raise
             except Exception as e:
                 logger.error(f"[{symbol}] Trial failed: {e}")
+                raise
+
+            # Custom Score: Heavily penalize low precision
+            score = (metrics['accuracy'] * 0.4) + (metrics['precision'] * 0.6)
+
+            # Check if meets minimum standards
+            if metrics['accuracy'] < MIN_ACCURACY or metrics['precision'] < MIN_PRECISION:
+                score = score * 0.5 # Penalty
+
+            if score > best_run["score"]:
+                best_run.update(model=model, metrics=metrics, score=score)
+
+            # Early exit if excellent model found
+            if metrics['accuracy'] > 0.60 and metrics['precision'] > 0.55:
+                logger.info(f"[{symbol}] 🌟 Excellent model found! Acc={metrics['accuracy']}, Prec={metrics['precision']}")
+                trial.study.stop()
+
+            return score
+
+        def stop_when_requested(study, trial):
+            if not self.running:
+                study.stop()
+
+        # Optimization Loop: TPE sampling + median pruning on validation logloss
+        study = optuna.create_study(
+            study_name=f"{symbol}USDT_{horizon}m",
+            storage=STUDY_STORAGE,
+            load_if_exists=True,
+            direction='maximize',
+            sampler=optuna.samplers.TPESampler(),
+            pruner=optuna.pruners.MedianPruner(n_warmup_steps=PRUNE_WARMUP_ROUNDS)
+        )
+        study.optimize(
+            objective,
+            n_trials=MAX_TRIALS_PER_RUN,
+            timeout=TRIALS_TIMEOUT,
+            callbacks=[stop_when_requested],
+            catch=(Exception,)
+        )
+
+        best_model_run = best_run["model"]
+        best_metrics_run = best_run["metrics"]
 
         # Decide whether to save
         if best_metrics_run:
@@ -247,6 +359,10 @@ class AutoOptimizer:
                     logger.info(f"[{symbol}] 📈 Incremental improvement (still below standards).")
             
             if should_save:
+                # Trained on bare arrays: restore column names so predictors can align features
+                best_model_run.get_booster().feature_names = features
+                # Serving hosts may have no GPU, and the pruning callback holds the live trial
+                best_model_run.set_params(device='cpu', callbacks=None)
                 self.save_model(symbol, horizon, best_model_run, best_metrics_run)
                 return True
             else:
@@ -260,8 +376,8 @@ class AutoOptimizer:
         tmp_path = os.path.join(MODELS_DIR, f"{model_filename}.tmp")
         final_path = os.path.join(MODELS_DIR, model_filename)
         
-        # Atomic save
-        joblib.dump(model, tmp_path)
+        # Atomic save (lz4: much smaller files, joblib.load detects it transparently)
+        joblib.dump(model, tmp_path, compress=('lz4', 3), protocol=5)
         os.rename(tmp_path, final_path)
         
         metrics["model_path"] = model_filename
@@ -271,33 +387,41 @@ class AutoOptimizer:
             self.metrics[symbol_key] = {}
         self.metrics[symbol_key][f"{horizon}m"] = metrics
         
-        self.save_metrics()
+        # Written once per cycle by flush_metrics()
+        self._metrics_dirty = True
         logger.info(f"[{symbol}] 💾 Model saved to {final_path}")
 
+    @staticmethod
+    def passes_standards(metrics):
+        return (metrics.get("accuracy", 0) >= MIN_ACCURACY and
+                metrics.get("precision", 0) >= MIN_PRECISION)
+
     def run(self):
         logger.info("Starting Auto Optimizer Loop...")
         logger.info(f"Target Symbols: {TARGET_SYMBOLS}")
+        logger.info(f"Training device: {'cuda' if USE_CUDA else 'cpu'}")
         
         while self.running:
             # Shuffle symbols to be fair
             symbols = list(TARGET_SYMBOLS)
             random.shuffle(symbols)
             
-            all_passed = True
+            # Resolve which symbols already meet the standards once per cycle
+            qualified = {
+                symbol_key for symbol_key, metrics in self.metrics.items()
+                if self.passes_standards(metrics.get("10m", {}))
+            }
+            all_passed = all(f"{symbol}USDT" in qualified for symbol in symbols)
             
             for symbol in symbols:
                 if not self.running: break
                 
-                # Check status
-                symbol_key = f"{symbol}USDT"
-                metrics = self.metrics.get(symbol_key, {}).get("10m", {})
-                acc = metrics.get("accuracy", 0)
-                prec = metrics.get("precision", 0)
-                
-                passed = (acc >= MIN_ACCURACY and prec >= MIN_PRECISION)
-                if not passed:
-                    all_passed = False
-                    logger.info(f"[{symbol}] Needs optimization (Acc={acc}, Prec={prec}). Starting...")
+                if f"{symbol}USDT" in qualified:
+                    logger.info(f"[{symbol}] ✅ Passed standards. Skipping.")
+                    continue
+
+                metrics = self.metrics.get(f"{symbol}USDT", {}).get("10m", {})
+                logger.info(f"[{symbol}] Needs optimization (Acc={metrics.get('accuracy', 0)}, Prec={metrics.get('precision', 0)}). Starting...")
                 try:
                     self.optimize_symbol(symbol)
                 except Exception as e:
@@ -305,16 +429,8 @@ class AutoOptimizer:
                     
                 # Sleep to cool down
                 time.sleep(5)
-            else:
-                # Randomly re-optimize even if passed, to find even better models (10% chance)
-                # if random.random() < 0.1:
-                #     logger.info(f"[{symbol}] Passed (Acc={acc}), but trying to improve...")
-                #     try:
-                #         self.optimize_symbol(symbol)
-                #     except Exception as e:
-                #         logger.error(f"[{symbol}] Critical error during improvement: {e}")
-                # else:
-                logger.info(f"[{symbol}] ✅ Passed standards. Skipping.")
+
+            self.flush_metrics()
                 
             if all_passed:
                 logger.info("🎉 All models passed standards! Optimizer stopping as requested.")
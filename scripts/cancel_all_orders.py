@@ -1,96 +1,95 @@
 import os
 import sys
 import logging
-import ccxt
-import time
-from dotenv import load_dotenv
+import asyncio
+from decimal import Decimal, ROUND_HALF_UP
 
 # Add project root to path
 sys.path.append(os.getcwd())
 
+from src.utils.exchange import FUTURES_SYMBOLS as SYMBOLS, create_async_futures_exchange
+from src.utils.markets_cache import load_markets_cached
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Config
-PROXY_URL = "http://127.0.0.1:33210"
-PROXIES = {
-    'http': PROXY_URL,
-    'https': PROXY_URL
-}
-
 # New Strategy Parameters
 SL_PCT = 0.02  # 2%
 TP_PCT = 0.06  # 6%
 
-# Monitored Symbols
-SYMBOLS = [
-    'BTC/USDT:USDT', 'ETH/USDT:USDT', 'SOL/USDT:USDT', 'BNB/USDT:USDT', 'DOGE/USDT:USDT',
-    'XRP/USDT:USDT', '1000PEPE/USDT:USDT', 'AVAX/USDT:USDT', 'LINK/USDT:USDT', 'ADA/USDT:USDT',
-    'TRX/USDT:USDT', 'LDO/USDT:USDT', 'BCH/USDT:USDT', 'OP/USDT:USDT'
-]
+def round_to_tick(price, tick):
+    """Round to the nearest tick (ccxt ROUND mode) and format like price_to_precision."""
+    steps = (Decimal(str(price)) / tick).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return format(steps * tick, 'f')
 
-def get_exchange():
-    load_dotenv()
-    api_key = os.getenv("BINANCE_API_KEY")
-    secret = os.getenv("BINANCE_SECRET")
-    
-    if not api_key or not secret:
-        logger.error("API credentials missing")
-        return None
-        
-    exchange = ccxt.binanceusdm({
-        'apiKey': api_key,
-        'secret': secret,
-        'enableRateLimit': True,
-        'options': {'defaultType': 'swap'},
-        'proxies': PROXIES,
-        'timeout': 30000,
-    })
-    return exchange
+async def cancel_symbol_orders(exchange, symbol):
+    try:
+        # Cancel all open orders
+        await exchange.cancel_all_orders(symbol)
+        logger.info("[%s] Cancelled all open orders.", symbol)
+    except Exception as e:
+        logger.warning("[%s] Cancel failed (might be no orders): %s", symbol, e)
 
-def reset_orders():
-    exchange = get_exchange()
+async def place_order(exchange, order):
+    # Conditional SL/TP orders route to the algo order endpoint, so each goes through create_order
+    label = 'SL' if order['type'] == 'STOP_MARKET' else 'TP'
+    try:
+        await exchange.create_order(order['symbol'], order['type'], order['side'], order['amount'], params=order['params'])
+        logger.info("[%s] Placed New %s at %s", order['symbol'], label, order['params']['stopPrice'])
+    except Exception as e:
+        logger.error("[%s] Failed to place %s: %s", order['symbol'], label, e)
+
+async def reset_orders():
+    exchange = create_async_futures_exchange()
     if not exchange:
         return
         
     try:
-        exchange.load_markets()
+        # Reuse exchangeInfo from disk when fresh instead of re-downloading it
+        await load_markets_cached(exchange)
         logger.info("Connected to Binance Futures")
         
         logger.info(f"Targeting {len(SYMBOLS)} symbols: {SYMBOLS}")
         
+        # Two account-wide requests replace the per-symbol scan: every open order and every position
+        target = set(SYMBOLS)
+        open_orders, positions = await asyncio.gather(
+            exchange.fetch_open_orders(),
+            exchange.fetch_positions(),
+        )
+
         # 1. Cancel All Orders
-        for symbol in SYMBOLS:
-            try:
-                # Cancel all open orders
-                exchange.cancel_all_orders(symbol)
-                logger.info(f"[{symbol}] Cancelled all open orders.")
-            except Exception as e:
-                logger.warning(f"[{symbol}] Cancel failed (might be no orders): {e}")
+        # Only symbols that actually have open orders need a cancel request
+        symbols_with_orders = {o['symbol'] for o in open_orders} & target
+        logger.info(f"Open orders on {len(symbols_with_orders)} symbols: {sorted(symbols_with_orders)}")
+        await asyncio.gather(*(cancel_symbol_orders(exchange, symbol) for symbol in symbols_with_orders))
 
-        # 2. Fetch Active Positions and Reset SL/TP
-        logger.info("Fetching active positions to reset SL/TP...")
+        # 2. Reset SL/TP on Active Positions
+        logger.info("Resetting SL/TP on active positions...")
         try:
-            # fetch_positions might behave differently depending on exchange
-            # For Binance, fetch_positions(symbols) is supported
-            positions = exchange.fetch_positions(SYMBOLS)
-            
-            active_positions = []
-            for pos in positions:
-                amt = float(pos['contracts'])
-                if amt > 0:
-                    active_positions.append(pos)
+            active_positions = [
+                pos for pos in positions
+                if pos['symbol'] in target and float(pos['contracts'] or 0) > 0
+            ]
             
             logger.info(f"Found {len(active_positions)} active positions.")
+
+            # Tick size is fixed per symbol; resolve it once instead of per price_to_precision call
+            tick_sizes = {
+                pos['symbol']: Decimal(str(exchange.markets[pos['symbol']]['precision']['price']))
+                for pos in active_positions
+            }
             
+            # Collect every SL/TP first, then place them concurrently
+            orders = []
             for pos in active_positions:
                 symbol = pos['symbol']
                 side = pos['side'] # 'long' or 'short'
                 entry_price = float(pos['entryPrice'])
                 amount = float(pos['contracts']) # Position size
                 
-                logger.info(f"Resetting orders for {symbol} ({side} {amount} @ {entry_price})")
+                logger.info("Resetting orders for %s (%s %s @ %s)", symbol, side, amount, entry_price)
                 
                 # Calculate New SL/TP
                 sl_price = 0.0
@@ -106,30 +105,23 @@ def reset_orders():
                     sl_side = 'buy'
                 
                 # Precision
-                sl_price = exchange.price_to_precision(symbol, sl_price)
-                tp_price = exchange.price_to_precision(symbol, tp_price)
-                
-                # Place STOP_MARKET (SL)
-                try:
-                    params = {
-                        'stopPrice': sl_price,
-                        'reduceOnly': True
-                    }
-                    exchange.create_order(symbol, 'STOP_MARKET', sl_side, amount, None, params)
-                    logger.info(f"[{symbol}] Placed New SL at {sl_price}")
-                except Exception as e:
-                    logger.error(f"[{symbol}] Failed to place SL: {e}")
+                sl_price = round_to_tick(sl_price, tick_sizes[symbol])
+                tp_price = round_to_tick(tp_price, tick_sizes[symbol])
                 
-                # Place TAKE_PROFIT_MARKET (TP)
-                try:
-                    params = {
-                        'stopPrice': tp_price,
-                        'reduceOnly': True
-                    }
-                    exchange.create_order(symbol, 'TAKE_PROFIT_MARKET', sl_side, amount, None, params)
-                    logger.info(f"[{symbol}] Placed New TP at {tp_price}")
-                except Exception as e:
-                    logger.error(f"[{symbol}] Failed to place TP: {e}")
+                # STOP_MARKET (SL) + TAKE_PROFIT_MARKET (TP)
+                for order_type, stop_price in (('STOP_MARKET', sl_price), ('TAKE_PROFIT_MARKET', tp_price)):
+                    orders.append({
+                        'symbol': symbol,
+                        'type': order_type,
+                        'side': sl_side,
+                        'amount': amount,
+                        'params': {
+                            'stopPrice': stop_price,
+                            'reduceOnly': True
+                        }
+                    })
+
+            await asyncio.gather(*(place_order(exchange, order) for order in orders))
                     
         except Exception as e:
             logger.error(f"Error processing positions: {e}")
@@ -138,6 +130,8 @@ def reset_orders():
         
     except Exception as e:
         logger.error(f"Global error: {e}")
+    finally:
+        await exchange.close()
 
 if __name__ == "__main__":
-    reset_orders()
+    asyncio.run(reset_orders())
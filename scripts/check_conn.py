@@ -1,20 +1,24 @@
-import ccxt
-import time
-import requests
+import asyncio
+import aiohttp
+import orjson
+import ccxt.async_support as ccxt
 
-def check_binance():
-    print("Checking Binance connectivity via CCXT...")
+async def check_ccxt_exchange(name, exchange):
     try:
-        exchange = ccxt.binance({'timeout': 5000})
-        ticker = exchange.fetch_ticker('BTC/USDT')
-        print(f"SUCCESS: Binance BTC/USDT price: {ticker['last']}")
+        ticker = await exchange.fetch_ticker('BTC/USDT')
+        print(f"SUCCESS: {name} BTC/USDT price: {ticker['last']}")
         return True
     except Exception as e:
-        print(f"FAILED: Binance CCXT error: {e}")
+        print(f"FAILED: {name} CCXT error: {e}")
         return False
+    finally:
+        await exchange.close()
 
-def check_yfinance():
-    print("\nChecking yfinance connectivity...")
+async def check_binance():
+    print("Checking Binance connectivity via CCXT...")
+    return await check_ccxt_exchange("Binance", ccxt.binance({'timeout': 5000}))
+
+def _check_yfinance():
     try:
         import yfinance as yf
         ticker = yf.Ticker("BTC-USD")
@@ -29,82 +33,83 @@ def check_yfinance():
         print(f"FAILED: yfinance error: {e}")
         return False
 
-def check_coingecko():
+async def check_yfinance():
+    print("\nChecking yfinance connectivity...")
+    # yfinance is blocking; keep it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, _check_yfinance)
+
+async def check_coingecko(session):
     print("\nChecking CoinGecko API...")
     try:
         url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            print(f"SUCCESS: CoinGecko BTC price: {resp.json()['bitcoin']['usd']}")
-            return True
-        else:
-            print(f"FAILED: CoinGecko status {resp.status_code}")
-            return False
+        async with session.get(url) as resp:
+            if resp.status == 200:
+                data = await resp.json(loads=orjson.loads)
+                print(f"SUCCESS: CoinGecko BTC price: {data['bitcoin']['usd']}")
+                return True
+            else:
+                print(f"FAILED: CoinGecko status {resp.status}")
+                return False
     except Exception as e:
         print(f"FAILED: CoinGecko error: {e}")
         return False
 
-def check_okx():
+async def check_okx():
     print("\nChecking OKX connectivity via CCXT...")
-    try:
-        exchange = ccxt.okx({'timeout': 5000})
-        ticker = exchange.fetch_ticker('BTC/USDT')
-        print(f"SUCCESS: OKX BTC/USDT price: {ticker['last']}")
-        return True
-    except Exception as e:
-        print(f"FAILED: OKX CCXT error: {e}")
-        return False
+    return await check_ccxt_exchange("OKX", ccxt.okx({'timeout': 5000}))
 
-def check_bybit():
+async def check_bybit():
     print("\nChecking Bybit connectivity via CCXT...")
-    try:
-        exchange = ccxt.bybit({'timeout': 5000})
-        ticker = exchange.fetch_ticker('BTC/USDT')
-        print(f"SUCCESS: Bybit BTC/USDT price: {ticker['last']}")
-        return True
-    except Exception as e:
-        print(f"FAILED: Bybit CCXT error: {e}")
-        return False
+    return await check_ccxt_exchange("Bybit", ccxt.bybit({'timeout': 5000}))
 
-def check_coincap():
+async def check_coincap(session):
     print("\nChecking CoinCap API...")
     try:
         url = "https://api.coincap.io/v2/assets/bitcoin"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            print(f"SUCCESS: CoinCap BTC price: {resp.json()['data']['priceUsd']}")
-            return True
-        else:
-            print(f"FAILED: CoinCap status {resp.status_code}")
-            return False
+        async with session.get(url) as resp:
+            if resp.status == 200:
+                data = await resp.json(loads=orjson.loads)
+                print(f"SUCCESS: CoinCap BTC price: {data['data']['priceUsd']}")
+                return True
+            else:
+                print(f"FAILED: CoinCap status {resp.status}")
+                return False
     except Exception as e:
         print(f"FAILED: CoinCap error: {e}")
         return False
 
-def check_binance_vision():
+async def check_binance_vision(session):
     print("\nChecking Binance Vision (Public Data) API...")
     try:
         url = "https://data-api.binance.vision/api/v3/ticker/price?symbol=BTCUSDT"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            print(f"SUCCESS: Binance Vision BTC price: {resp.json()['price']}")
-            return True
-        else:
-            print(f"FAILED: Binance Vision status {resp.status_code}")
-            return False
+        async with session.get(url) as resp:
+            if resp.status == 200:
+                data = await resp.json(loads=orjson.loads)
+                print(f"SUCCESS: Binance Vision BTC price: {data['price']}")
+                return True
+            else:
+                print(f"FAILED: Binance Vision status {resp.status}")
+                return False
     except Exception as e:
         print(f"FAILED: Binance Vision error: {e}")
         return False
 
+async def main():
+    # One shared HTTP session for the plain REST probes; everything runs on one event loop
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        return await asyncio.gather(
+            check_binance(),
+            check_yfinance(),
+            check_coingecko(session),
+            check_okx(),
+            check_bybit(),
+            check_coincap(session),
+            check_binance_vision(session),
+        )
+
 if __name__ == "__main__":
-    b = check_binance()
-    y = check_yfinance()
-    c = check_coingecko()
-    o = check_okx()
-    by = check_bybit()
-    cc = check_coincap()
-    bv = check_binance_vision()
-    
+    b, y, c, o, by, cc, bv = asyncio.run(main())
+
     print("\nSummary:")
     print(f"Binance: {'OK' if b else 'FAIL'}")
     print(f"yfinance: {'OK' if y else 'FAIL'}")
@@ -112,4 +117,4 @@ if __name__ == "__main__":
     print(f"OKX: {'OK' if o else 'FAIL'}")
     print(f"Bybit: {'OK' if by else 'FAIL'}")
     print(f"CoinCap: {'OK' if cc else 'FAIL'}")
-    print(f"Binance Vision: {'OK' if bv else 'FAIL'}")
\ No newline at end of file
+    print(f"Binance Vision: {'OK' if bv else 'FAIL'}")
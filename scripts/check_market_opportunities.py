@@ -5,6 +5,8 @@ import pandas as pd
 import logging
 import warnings
 from datetime import datetime
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
@@ -26,6 +28,88 @@ logging.getLogger("src.data.collector").setLevel(logging.WARNING)
 logging.getLogger("src.models.predictor").setLevel(logging.WARNING)
 logging.getLogger("src.strategies.trend_ml_strategy").setLevel(logging.WARNING)
 
+@lru_cache(maxsize=1)
+def get_strategy():
+    # No per-symbol state, one instance serves every symbol
+    return TrendMLStrategy(enable_czsc=True)
+
+@lru_cache(maxsize=16)
+def get_predictor(symbol):
+    # Loads the symbol's models from disk once, later calls reuse them
+    return PricePredictor(symbol=symbol)
+
+def analyze_symbol(symbol, proxies=None):
+    """Fetch, predict and evaluate one symbol. Returns an opportunity dict or None."""
+    try:
+        # 3. Initialize Components (strategy + predictors are reused per worker process)
+        collector = CryptoDataCollector(symbol=symbol, proxies=proxies)
+        predictor = get_predictor(symbol)
+        strategy = get_strategy()
+        
+        # 4. Fetch Data (5m timeframe)
+        # Need enough for EMA200 (200 * 5m)
+        df_5m = collector.fetch_ohlcv(timeframe='5m', limit=500)
+        
+        if df_5m is None or df_5m.empty:
+            logger.warning(f"No data for {symbol}")
+            return None
+            
+        # 5. Predict
+        # Predictor generates features from passed DF
+        predictions = predictor.predict_all(df_5m)
+        
+        if not predictions:
+            logger.warning(f"No predictions for {symbol}")
+            return None
+
+        # 6. Run Strategy Analysis
+        df_analyzed = strategy.calculate_indicators(df_5m)
+        
+        # Check last row
+        if len(df_analyzed) < 2:
+            return None
+            
+        # Plain dicts: get_signal only does key lookups, no need to box two Series
+        prev_row, last_row = df_analyzed.tail(2).to_dict('records')
+        
+        # Construct extra_data
+        extra_data = {
+            'ml_prediction': predictions.get('30m', {}),
+            'ml_prediction_10m': predictions.get('10m', {}),
+            'total_capital': 1000.0 # Dummy capital for sizing calc
+        }
+        
+        result = strategy.get_signal(last_row, prev_row, extra_data)
+        
+        signal = result.get('signal', 0)
+        reason = result.get('reason', '')
+        indicators = result.get('indicators', {})
+        
+        ml_prob = indicators.get('ml_prob', 0.5)
+        close_price = last_row['close']
+        
+        # Print status for every coin
+        status = "NEUTRAL"
+        if signal == 1: status = "LONG"
+        elif signal == -1: status = "SHORT"
+        
+        logger.info(f"{symbol:<10} | {status:<7} | Price: {close_price:<10.4f} | ML(30m): {ml_prob:.2f} | Reason: {reason}")
+        
+        if signal != 0:
+            return {
+                'symbol': symbol,
+                'direction': status,
+                'price': close_price,
+                'ml_prob': ml_prob,
+                'reason': reason,
+                'tp': result.get('trade_params', {}).get('tp_price'),
+                'sl': result.get('trade_params', {}).get('sl_price')
+            }
+            
+    except Exception as e:
+        logger.error(f"Error processing {symbol}: {e}")
+    return None
+
 def scan_market():
     # 1. Load Configuration
     try:
@@ -52,78 +136,10 @@ def scan_market():
     logger.info("Strategy: TrendMLStrategy (Trend + ML + CZSC)")
     logger.info("-" * 60)
     
-    opportunities = []
-
-    for symbol in symbols:
-        try:
-            # 3. Initialize Components
-            collector = CryptoDataCollector(symbol=symbol, proxies=proxies)
-            predictor = PricePredictor(symbol=symbol)
-            strategy = TrendMLStrategy(enable_czsc=True)
-            
-            # 4. Fetch Data (5m timeframe)
-            # Need enough for EMA200 (200 * 5m)
-            df_5m = collector.fetch_ohlcv(timeframe='5m', limit=500)
-            
-            if df_5m is None or df_5m.empty:
-                logger.warning(f"No data for {symbol}")
-                continue
-                
-            # 5. Predict
-            # Predictor generates features from passed DF
-            predictions = predictor.predict_all(df_5m)
-            
-            if not predictions:
-                logger.warning(f"No predictions for {symbol}")
-                continue
-
-            # 6. Run Strategy Analysis
-            df_analyzed = strategy.calculate_indicators(df_5m)
-            
-            # Check last row
-            if len(df_analyzed) < 2:
-                continue
-                
-            last_row = df_analyzed.iloc[-1]
-            prev_row = df_analyzed.iloc[-2]
-            
-            # Construct extra_data
-            extra_data = {
-                'ml_prediction': predictions.get('30m', {}),
-                'ml_prediction_10m': predictions.get('10m', {}),
-                'total_capital': 1000.0 # Dummy capital for sizing calc
-            }
-            
-            result = strategy.get_signal(last_row, prev_row, extra_data)
-            
-            signal = result.get('signal', 0)
-            reason = result.get('reason', '')
-            indicators = result.get('indicators', {})
-            
-            ml_prob = indicators.get('ml_prob', 0.5)
-            close_price = last_row['close']
-            
-            # Print status for every coin
-            status = "NEUTRAL"
-            if signal == 1: status = "LONG"
-            elif signal == -1: status = "SHORT"
-            
-            logger.info(f"{symbol:<10} | {status:<7} | Price: {close_price:<10.4f} | ML(30m): {ml_prob:.2f} | Reason: {reason}")
-            
-            if signal != 0:
-                opportunities.append({
-                    'symbol': symbol,
-                    'direction': status,
-                    'price': close_price,
-                    'ml_prob': ml_prob,
-                    'reason': reason,
-                    'tp': result.get('trade_params', {}).get('tp_price'),
-                    'sl': result.get('trade_params', {}).get('sl_price')
-                })
-                
-        except Exception as e:
-            logger.error(f"Error processing {symbol}: {e}")
-            continue
+    # Per-symbol work is independent and CPU-heavy (features, ML inference), so fan out across processes
+    with ProcessPoolExecutor(max_workers=min(len(symbols), os.cpu_count() or 1)) as executor:
+        results = list(executor.map(partial(analyze_symbol, proxies=proxies), symbols))
+    opportunities = [opp for opp in results if opp]
             
     logger.info("-" * 60)
     logger.info(f"Scan Complete. Found {len(opportunities)} opportunities.")
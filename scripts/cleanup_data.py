@@ -1,5 +1,4 @@
 import os
-import shutil
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../src/data/raw') # Assuming running from scripts/
 if not os.path.exists(DATA_DIR):
@@ -15,35 +14,28 @@ KEEP_SYMBOLS = [
     'XRP', 'PEPE', 'AVAX', 'LINK', 'ADA',
     'TRX', 'LDO', 'BCH', 'OP'
 ]
+# Base names (e.g. BTCUSDT) to keep, built once at import
+KEEP_SET = frozenset(f"{sym}USDT" for sym in KEEP_SYMBOLS)
 
 def clean_data():
-    files = os.listdir(DATA_DIR)
     moved_count = 0
-    for f in files:
-        if not f.endswith('.csv'):
-            continue
+    # Archive lives on the same filesystem, so a plain rename is enough
+    with os.scandir(DATA_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.csv') or not entry.is_file():
+                continue
+                
+            # Format is SYMBOL_TIMEFRAME.csv, e.g. BTCUSDT_1m.csv
+            # Symbol usually has USDT appended if not present in the split logic, 
+            # but fetch script saves as "BTCUSDT_1m.csv" from "BTC/USDT:USDT"
             
-        # Format is SYMBOL_TIMEFRAME.csv, e.g. BTCUSDT_1m.csv
-        # Symbol usually has USDT appended if not present in the split logic, 
-        # but fetch script saves as "BTCUSDT_1m.csv" from "BTC/USDT:USDT"
-        
-        # Extract base symbol
-        base_name = f.split('_')[0] # e.g. BTCUSDT
-        
-        # Check if it starts with any of our keep symbols
-        keep = False
-        for sym in KEEP_SYMBOLS:
-            # Check for exact match with USDT suffix
-            if base_name == f"{sym}USDT":
-                keep = True
-                break
-        
-        if not keep:
-            src = os.path.join(DATA_DIR, f)
-            dst = os.path.join(ARCHIVE_DIR, f)
-            print(f"Moving {f} to archive...")
-            shutil.move(src, dst)
-            moved_count += 1
+            # Extract base symbol
+            base_name = entry.name.split('_')[0] # e.g. BTCUSDT
+            
+            if base_name not in KEEP_SET:
+                print(f"Moving {entry.name} to archive...")
+                os.rename(entry.path, os.path.join(ARCHIVE_DIR, entry.name))
+                moved_count += 1
             
     print(f"Cleanup complete. Moved {moved_count} files to {ARCHIVE_DIR}")
 
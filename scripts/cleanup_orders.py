@@ -1,129 +1,89 @@
 import os
 import sys
 import logging
-import ccxt
-import time
-from dotenv import load_dotenv
+import asyncio
 
 # Add project root to path
 sys.path.append(os.getcwd())
 
+from src.utils.exchange import FUTURES_SYMBOLS, create_async_futures_exchange
+from src.utils.markets_cache import load_markets_cached
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load env
-load_dotenv()
+async def cleanup():
+    exchange = create_async_futures_exchange()
+    if not exchange:
+        return
+    
+    try:
+        try:
+            logger.info("Connecting to Binance Futures...")
+            # Reuse exchangeInfo from disk when fresh instead of re-downloading it
+            await load_markets_cached(exchange)
+        except Exception as e:
+            logger.error(f"Failed to connect: {e}")
+            return
 
-# 14 Target Symbols (Mapped to CCXT Futures format)
-# Note: PEPE is 1000PEPE on Binance Futures usually
-SYMBOL_MAP = {
-    'BTC/USDT': 'BTC/USDT:USDT',
-    'ETH/USDT': 'ETH/USDT:USDT',
-    'SOL/USDT': 'SOL/USDT:USDT',
-    'BNB/USDT': 'BNB/USDT:USDT',
-    'DOGE/USDT': 'DOGE/USDT:USDT',
-    'XRP/USDT': 'XRP/USDT:USDT',
-    'PEPE/USDT': '1000PEPE/USDT:USDT',
-    'AVAX/USDT': 'AVAX/USDT:USDT',
-    'LINK/USDT': 'LINK/USDT:USDT',
-    'ADA/USDT': 'ADA/USDT:USDT',
-    'TRX/USDT': 'TRX/USDT:USDT',
-    'LDO/USDT': 'LDO/USDT:USDT',
-    'BCH/USDT': 'BCH/USDT:USDT',
-    'OP/USDT': 'OP/USDT:USDT'
-}
+        # One symbol-less request for every standard open order, grouped by symbol
+        orders_by_symbol = {}
+        for order in await exchange.fetch_open_orders():
+            orders_by_symbol.setdefault(order['symbol'], []).append(order)
 
-def cleanup():
-    api_key = os.getenv("BINANCE_API_KEY")
-    secret = os.getenv("BINANCE_SECRET")
-    
-    # Proxy Logic matching run_multicoin_bot.py
-    proxy_url = os.getenv("PROXY_URL")
-    if proxy_url is None:
-        proxy_url = "http://127.0.0.1:33210" # Default for local dev
-    elif proxy_url == "":
-        proxy_url = None # Explicitly disabled
-    
-    if not api_key or not secret:
-        logger.error("API credentials missing in .env")
-        return
+        # All symbols concurrently; ccxt's rate limiter spaces the requests
+        await asyncio.gather(*(
+            clean_symbol(exchange, symbol, orders_by_symbol.get(symbol, []))
+            for symbol in FUTURES_SYMBOLS
+        ))
+    finally:
+        await exchange.close()
 
-    options = {
-        'apiKey': api_key,
-        'secret': secret,
-        'options': {
-            'defaultType': 'swap',
-            'fetchCurrencies': False  # Disable fetching currencies to avoid hitting sapi
-        },
-        'has': {
-            'fetchCurrencies': False
-        },
-        'enableRateLimit': True
-    }
-    
-    if proxy_url:
-        options['proxies'] = {
-            'http': proxy_url,
-            'https': proxy_url
-        }
-        logger.info(f"Using proxy: {proxy_url}")
+    logger.info("Cleanup complete.")
 
-    exchange = ccxt.binanceusdm(options)
+async def cancel_algo_order(exchange, raw_symbol, order):
+    oid = order.get('orderId')
+    if not oid:
+        oid = order.get('algoId') # Check if it's called algoId
     
-    try:
-        logger.info("Connecting to Binance Futures...")
-        exchange.load_markets()
-    except Exception as e:
-        logger.error(f"Failed to connect: {e}")
-        return
-    
-    for symbol in SYMBOL_MAP.values():
-        logger.info(f"--- Cleaning {symbol} ---")
+    if oid:
         try:
-            # 1. Fetch Open Orders
-            orders = exchange.fetch_open_orders(symbol)
-            if orders:
-                logger.info(f"Found {len(orders)} standard open orders. Cancelling...")
-                exchange.cancel_all_orders(symbol)
-                logger.info("✅ Cancelled all standard open orders.")
-            else:
-                logger.info("No standard open orders found.")
+            # Use correct parameter name 'algoId'
+            await exchange.fapiPrivateDeleteAlgoOrder({'symbol': raw_symbol, 'algoId': oid})
+            logger.info("Cancelled Algo Order %s", oid)
+        except Exception as e:
+            logger.error("Failed to cancel Algo Order %s: %s", oid, e)
+    else:
+        logger.warning("Could not find ID for order: %s", order)
 
-            # 2. Check Algo Orders (using private API)
-            # Some SL/TP orders might exist as Algo Orders
-            try:
-                raw_symbol = symbol.replace('/', '').replace(':USDT', '').replace(':BUSD', '')
-                algo_orders = exchange.fapiPrivateGetOpenAlgoOrders({'symbol': raw_symbol})
-                if algo_orders and len(algo_orders) > 0:
-                    logger.info(f"Found {len(algo_orders)} algo orders. Cancelling...")
-                    logger.info(f"Sample order: {algo_orders[0]}")
-                    
-                    for order in algo_orders:
-                         oid = order.get('orderId')
-                         if not oid:
-                             oid = order.get('algoId') # Check if it's called algoId
-                         
-                         if oid:
-                             try:
-                                 # Use correct parameter name 'algoId'
-                                 exchange.fapiPrivateDeleteAlgoOrder({'symbol': raw_symbol, 'algoId': oid})
-                                 logger.info(f"Cancelled Algo Order {oid}")
-                             except Exception as e:
-                                 logger.error(f"Failed to cancel Algo Order {oid}: {e}")
-                         else:
-                             logger.warning(f"Could not find ID for order: {order}")
-                else:
-                    logger.info("No algo orders found.")
-            except Exception as e:
-                logger.warning(f"Error checking algo orders: {e}")
+async def clean_symbol(exchange, symbol, orders):
+    logger.info("--- Cleaning %s ---", symbol)
+    try:
+        # 1. Cancel Open Orders
+        if orders:
+            logger.info("[%s] Found %d standard open orders. Cancelling...", symbol, len(orders))
+            await exchange.cancel_all_orders(symbol)
+            logger.info("[%s] ✅ Cancelled all standard open orders.", symbol)
+        else:
+            logger.info("[%s] No standard open orders found.", symbol)
 
+        # 2. Check Algo Orders (using private API)
+        # Some SL/TP orders might exist as Algo Orders
+        try:
+            raw_symbol = symbol.replace('/', '').replace(':USDT', '').replace(':BUSD', '')
+            algo_orders = await exchange.fapiPrivateGetOpenAlgoOrders({'symbol': raw_symbol})
+            if algo_orders and len(algo_orders) > 0:
+                logger.info("[%s] Found %d algo orders. Cancelling...", symbol, len(algo_orders))
+                logger.info("[%s] Sample order: %s", symbol, algo_orders[0])
+                await asyncio.gather(*(cancel_algo_order(exchange, raw_symbol, order) for order in algo_orders))
+            else:
+                logger.info("[%s] No algo orders found.", symbol)
         except Exception as e:
-            logger.error(f"Error processing {symbol}: {e}")
-        
-        time.sleep(0.5) # Avoid rate limits
+            logger.warning("[%s] Error checking algo orders: %s", symbol, e)
 
-    logger.info("Cleanup complete.")
+    except Exception as e:
+        logger.error("Error processing %s: %s", symbol, e)
 
 if __name__ == "__main__":
-    cleanup()
+    asyncio.run(cleanup())
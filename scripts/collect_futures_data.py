@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 import time
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src to python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -17,6 +18,26 @@ logger = logging.getLogger(__name__)
 
 DATA_DIR = "src/data"
 OUTPUT_FILE = os.path.join(DATA_DIR, "btc_futures_data.csv")
+OI_LIMIT = 500
+OI_PERIOD_MS = 3600 * 1000
+OI_MAX_WORKERS = 8
+
+def fill_gaps(values):
+    """Forward fill NaNs, back fill any leading NaNs, then zero-fill an all-NaN column (single pass)"""
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.zeros_like(values)
+    idx = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[idx]
+    filled[:valid.argmax()] = values[valid.argmax()]
+    return filled
+
+def to_ms(series):
+    """Epoch milliseconds as int64, whether the column holds datetimes or raw ms"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype='datetime64[ms]').astype('int64')
+    return series.to_numpy(dtype='int64')
 
 def collect_data(days=90, timeframe='5m'):
     """
@@ -83,48 +104,46 @@ def collect_data(days=90, timeframe='5m'):
          # If we use 1h OI, we can ffill.
          pass
          
-    # Loop for OI
-    all_oi = []
-    current_start = start_time
-    
     # Binance might limit historical data availability for OI (e.g. 30 days)
     # If start_time is too old, let's try to fetch from 30 days ago
+    oi_start = start_time
     min_start_time = int((datetime.now() - timedelta(days=29)).timestamp() * 1000)
-    if current_start < min_start_time:
+    if oi_start < min_start_time:
         logger.warning(f"Adjusting start time for OI to 29 days ago (API limit).")
-        current_start = min_start_time
+        oi_start = min_start_time
 
-    while current_start < end_time:
-        # Fetch batch
-        # limit 500
-        # interval 1h -> 500 hours ~ 20 days
+    # limit 500, interval 1h -> each window covers 500 hours (~20 days)
+    # Windows don't depend on each other, so request them all at once
+    window = OI_LIMIT * OI_PERIOD_MS
+    starts = list(range(oi_start, end_time, window))
+
+    def fetch_oi(window_start):
         try:
-            df_batch = collector.fetch_open_interest_history(period=oi_period, limit=500, start_time=current_start)
-            
-            if df_batch.empty:
-                logger.warning(f"Empty batch for OI at {current_start}")
-                # Try to skip forward if stuck
-                current_start += 3600000 * 24 # Skip 1 day
-                continue
-                
-            all_oi.append(df_batch)
-            
-            last_ts = df_batch['timestamp'].max()
-            if last_ts >= end_time or last_ts <= current_start:
-                break
-                
-            current_start = last_ts + 1 # Next ms
-            time.sleep(0.2)
+            df_batch = collector.fetch_open_interest_history(
+                period=oi_period, limit=OI_LIMIT,
+                start_time=window_start, end_time=min(window_start + window - 1, end_time)
+            )
         except Exception as e:
             logger.error(f"Error fetching OI batch: {e}")
-            break
+            return None
+        if df_batch.empty:
+            logger.warning(f"Empty batch for OI at {window_start}")
+            return None
+        return df_batch
+
+    with ThreadPoolExecutor(max_workers=OI_MAX_WORKERS) as executor:
+        all_oi = [df for df in executor.map(fetch_oi, starts) if df is not None]
         
     if all_oi:
-        df_oi = pd.concat(all_oi)
-        df_oi = df_oi.drop_duplicates(subset=['timestamp']).sort_values('timestamp')
+        # Concatenate the three needed columns as arrays; np.unique dedupes and sorts in one step
+        ts = np.concatenate([df['timestamp'].to_numpy(dtype='int64') for df in all_oi])
+        _, keep = np.unique(ts, return_index=True)
+        df_oi = pd.DataFrame({
+            'timestamp': ts[keep],
+            'oi': np.concatenate([df['sumOpenInterest'].to_numpy(dtype=float) for df in all_oi])[keep],
+            'oi_value': np.concatenate([df['sumOpenInterestValue'].to_numpy(dtype=float) for df in all_oi])[keep],
+        })
         logger.info(f"Fetched {len(df_oi)} OI records.")
-        df_oi = df_oi[['timestamp', 'sumOpenInterest', 'sumOpenInterestValue']]
-        df_oi = df_oi.rename(columns={'sumOpenInterest': 'oi', 'sumOpenInterestValue': 'oi_value'})
     else:
         df_oi = pd.DataFrame()
         logger.warning("No Open Interest data found.")
@@ -132,39 +151,42 @@ def collect_data(days=90, timeframe='5m'):
     # 4. Merge Data
     logger.info("Merging data...")
     
-    # Convert timestamps to datetime for merging
-    df_ohlcv['datetime'] = pd.to_datetime(df_ohlcv['timestamp'], unit='ms')
+    # Join on the raw int64 ms timestamps; no datetime columns are built or written out
+    # (FeatureEngineer derives datetime from timestamp when it loads the file)
+    # Candles arrive in order from the paginated fetch; only sort if that ever stops holding
+    if not df_ohlcv['timestamp'].is_monotonic_increasing:
+        df_ohlcv = df_ohlcv.sort_values('timestamp', kind='mergesort', ignore_index=True)
+    df_ohlcv = df_ohlcv.drop(columns='datetime', errors='ignore')
+    ohlcv_ts = df_ohlcv['timestamp'].to_numpy(dtype='int64')
     
-    # Funding Rate: Merge on nearest timestamp (ffill)
+    # Funding Rate: latest known rate at or before each candle (backward asof join)
     # Funding rate comes every 8h. We want to forward fill it.
     if not df_funding.empty:
-        df_funding['datetime'] = pd.to_datetime(df_funding['timestamp'], unit='ms')
-        df_ohlcv = pd.merge_asof(df_ohlcv.sort_values('datetime'), 
-                                 df_funding[['datetime', 'funding_rate']].sort_values('datetime'), 
-                                 on='datetime', 
-                                 direction='backward') # Use latest known funding rate
+        funding_ts = to_ms(df_funding['timestamp'])
+        order = np.argsort(funding_ts, kind='mergesort')
+        pos = np.searchsorted(funding_ts[order], ohlcv_ts, side='right') - 1
+        rates = df_funding['funding_rate'].to_numpy(dtype=float)[order]
+        df_ohlcv['funding_rate'] = np.where(pos >= 0, rates[np.maximum(pos, 0)], 0.0)
+    else:
+        df_ohlcv['funding_rate'] = 0
                                  
-    # Open Interest: Merge on nearest timestamp
+    # Open Interest: nearest snapshot within 1h, then ffill/bfill the gaps
     if not df_oi.empty:
-        df_oi['datetime'] = pd.to_datetime(df_oi['timestamp'], unit='ms')
-        df_ohlcv = pd.merge_asof(df_ohlcv.sort_values('datetime'), 
-                                 df_oi[['datetime', 'oi', 'oi_value']].sort_values('datetime'), 
-                                 on='datetime', 
-                                 direction='nearest', # OI is snapshot, nearest is okay or backward
-                                 tolerance=pd.Timedelta('1h')) # Don't match if too far
+        oi_ts = df_oi['timestamp'].to_numpy(dtype='int64')
+        right = np.clip(np.searchsorted(oi_ts, ohlcv_ts, side='left'), 0, len(oi_ts) - 1)
+        left = np.maximum(right - 1, 0)
+        dist_left = np.abs(ohlcv_ts - oi_ts[left])
+        dist_right = np.abs(oi_ts[right] - ohlcv_ts)
+        nearest = np.where(dist_left <= dist_right, left, right)
+        # Don't match if too far
+        matched = np.minimum(dist_left, dist_right) <= OI_PERIOD_MS
+        for col in ('oi', 'oi_value'):
+            values = np.where(matched, df_oi[col].to_numpy(dtype=float)[nearest], np.nan)
+            df_ohlcv[col] = fill_gaps(values)
     else:
         # Create empty columns if OI missing
         df_ohlcv['oi'] = 0
         df_ohlcv['oi_value'] = 0
-                                 
-    # Fill NaNs (if missing funding/oi at start)
-    if 'funding_rate' in df_ohlcv.columns:
-        df_ohlcv['funding_rate'] = df_ohlcv['funding_rate'].fillna(0)
-    else:
-        df_ohlcv['funding_rate'] = 0
-        
-    df_ohlcv['oi'] = df_ohlcv['oi'].fillna(method='ffill').fillna(method='bfill').fillna(0)
-    df_ohlcv['oi_value'] = df_ohlcv['oi_value'].fillna(method='ffill').fillna(method='bfill').fillna(0)
     
     # Save
     logger.info(f"Saving merged data to {OUTPUT_FILE}...")
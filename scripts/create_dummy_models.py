@@ -1,6 +1,7 @@
 
 import os
 import sys
+import shutil
 import joblib
 import numpy as np
 import pandas as pd
@@ -24,20 +25,23 @@ def create_dummy_models():
     
     horizons = [10, 30, 60]
     
+    # Same data and seed for every horizon, so one fit serves them all
+    print(f"Training dummy model for {horizons} horizons...")
+    model = XGBClassifier(n_estimators=10, max_depth=2, random_state=42)
+    model.fit(X_df, y)
+    
+    source = None
     for h in horizons:
-        print(f"Training dummy model for {h}m horizon...")
-        model = XGBClassifier(n_estimators=10, max_depth=2, random_state=42)
-        model.fit(X_df, y)
-        
-        # Save generic model
-        path = os.path.join(models_dir, f"xgb_model_{h}m.joblib")
-        joblib.dump(model, path)
-        print(f"Saved {path}")
-        
-        # Save BTC specific model
-        path_btc = os.path.join(models_dir, f"xgb_BTCUSDT_{h}m.joblib")
-        joblib.dump(model, path_btc)
-        print(f"Saved {path_btc}")
+        # Generic model, then BTC specific model
+        for name in (f"xgb_model_{h}m.joblib", f"xgb_BTCUSDT_{h}m.joblib"):
+            path = os.path.join(models_dir, name)
+            if source is None:
+                joblib.dump(model, path, compress=('lz4', 3))
+                source = path
+            else:
+                # Copy rather than hardlink: retraining dumps over these paths in place
+                shutil.copyfile(source, path)
+            print(f"Saved {path}")
         
     print("Dummy models created successfully.")
 
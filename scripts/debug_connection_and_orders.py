@@ -1,15 +1,16 @@
 
 import sys
 import os
-import json
 import logging
 import traceback
+from collections import defaultdict
 from pprint import pprint
 
 # Add src to python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.trader.real_trader import RealTrader
+from src.utils.env import load_json_config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,10 +18,7 @@ logger = logging.getLogger(__name__)
 
 def load_config():
     config_path = os.path.join(os.path.dirname(__file__), '../trader_config.json')
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    return None
+    return load_json_config(config_path) or None
 
 def main():
     print("=== Debugging RealTrader Connection & Orders ===")
@@ -52,8 +50,11 @@ def main():
         
         # Check Balance
         try:
-            balance = trader.get_balance()
-            equity = trader.get_total_balance()
+            # get_balance and get_total_balance each hit /fapi/v2/account; read both from one response
+            account = trader.exchange.fetch_balance()
+            balance = account['USDT']['free']
+            info = account.get('info', {})
+            equity = float(info['totalMarginBalance']) if 'totalMarginBalance' in info else float(account['USDT']['total'])
             print(f"💰 Wallet Balance: {balance:.2f} USDT")
             print(f"💰 Equity (Total Margin Balance): {equity:.2f} USDT")
         except Exception as e:
@@ -67,6 +68,17 @@ def main():
             if not positions:
                 print("No open positions found.")
             else:
+                # One symbol-less request returns every open order; group them client-side
+                orders_by_symbol = defaultdict(list)
+                orders_error = None
+                # ccxt refuses symbol-less fetchOpenOrders unless this warning is switched off
+                trader.exchange.options['warnOnFetchOpenOrdersWithoutSymbol'] = False
+                try:
+                    for o in trader.exchange.fetch_open_orders():
+                        orders_by_symbol[o['symbol']].append(o)
+                except Exception as e:
+                    orders_error = e
+
                 for sym, pos in positions.items():
                     print(f"📌 {sym}:")
                     pprint(pos)
@@ -80,7 +92,9 @@ def main():
                         
                         # We use the symbol from the position dict if available, or the key
                         market_symbol = pos.get('symbol', sym)
-                        orders = trader.exchange.fetch_open_orders(market_symbol)
+                        if orders_error:
+                            raise orders_error
+                        orders = orders_by_symbol.get(market_symbol, [])
                         if not orders:
                             print("   No open orders.")
                         else:
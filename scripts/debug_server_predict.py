@@ -37,12 +37,13 @@ def debug_prediction():
     print("Columns:", full_df.columns.tolist())
     
     # Prepare X like predictor does
-    last_row = full_df.iloc[[-1]].copy()
-    exclude_cols = ['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume', 'target']
-    exclude_cols += [c for c in last_row.columns if c.startswith('target_')]
-    feature_cols = [c for c in last_row.columns if c not in exclude_cols]
+    exclude_cols = frozenset(['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume', 'target'])
+    feature_cols = [c for c in full_df.columns if c not in exclude_cols and not c.startswith('target_')]
+    feature_idx = full_df.columns.get_indexer(feature_cols)
     
-    X = last_row[feature_cols]
+    # Positional slice of the last row; no intermediate copy or label reindex
+    X = full_df.iloc[-1:, feature_idx]
+    X_np = full_df.values[-1:, feature_idx]
     print("X type:", type(X))
     print("X shape:", X.shape)
     print("X columns:", X.columns.tolist())
@@ -61,6 +62,11 @@ def debug_prediction():
                 prob = model.predict_proba(X)[0][1]
                 print(f"Prediction success: {prob}")
                 
+                # Raw ndarray skips the DataFrame -> numpy conversion inside predict_proba
+                print("Predicting with ndarray...")
+                prob_np = model.predict_proba(X_np)[0][1]
+                print(f"Prediction success: {prob_np}")
+                
             except Exception as e:
                 print(f"Prediction failed: {e}")
 
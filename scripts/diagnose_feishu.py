@@ -1,7 +1,6 @@
 
 import os
 import sys
-import asyncio
 from dotenv import load_dotenv
 
 # Add src to python path
@@ -9,7 +8,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.notification.feishu import FeishuBot
 
-async def main():
+def main():
     load_dotenv()
     webhook_url = os.getenv("FEISHU_WEBHOOK_URL")
     print(f"FEISHU_WEBHOOK_URL: {webhook_url}")
@@ -31,4 +30,4 @@ async def main():
         print(f"Error sending message: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
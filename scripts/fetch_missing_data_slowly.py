@@ -1,10 +1,16 @@
 import ccxt
-import pandas as pd
+import ccxt.async_support as ccxt_async
 import os
+import sys
 import time
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 import logging
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.ohlcv_csv import OhlcvCsvWriter, read_last_timestamp
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,28 +25,46 @@ logger = logging.getLogger(__name__)
 # Configuration
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw')
 DAYS_TO_FETCH = 180
+DAY_MS = 24 * 3600 * 1000
 TIMEFRAMES = ['1m', '5m', '1h']
+MAX_CONCURRENT_DOWNLOADS = 8
+# Back off once the 1m request weight reaches this (fapi IP limit is 2400/min)
+WEIGHT_BACKOFF_THRESHOLD = 1200
 
 # Proxies
 PROXY_URL = "http://127.0.0.1:33210"
-PROXIES = {
-    'http': PROXY_URL,
-    'https': PROXY_URL
-}
 
 def get_exchange():
-    """Initialize Binance Futures exchange connection"""
-    exchange = ccxt.binance({
+    """Initialize async Binance Futures exchange connection"""
+    exchange = ccxt_async.binance({
         'enableRateLimit': True,
         'options': {
             'defaultType': 'swap',
             'adjustForTimeDifference': True,
         },
-        'proxies': PROXIES,
+        'aiohttp_proxy': PROXY_URL,
         'timeout': 30000,
     })
     return exchange
 
+def get_used_weight(exchange):
+    """Read Binance's x-mbx-used-weight-1m from the last response, 0 if absent"""
+    for key, value in (exchange.last_response_headers or {}).items():
+        if key.lower() == 'x-mbx-used-weight-1m':
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return 0
+    return 0
+
+async def respect_weight_limit(exchange, symbol, timeframe):
+    """Sleep until the next minute window when the used weight gets close to the limit"""
+    used = get_used_weight(exchange)
+    if used >= WEIGHT_BACKOFF_THRESHOLD:
+        wait = 60 - time.time() % 60 + 1
+        logger.warning(f"[{symbol} {timeframe}] Used weight {used}, backing off {wait:.0f}s")
+        await asyncio.sleep(wait)
+
 def get_all_symbols():
     """Return Top 14 Selected Coins (Focus Strategy)"""
     symbols = [
@@ -50,67 +74,65 @@ def get_all_symbols():
     ]
     return symbols
 
-def fetch_history_for_symbol(exchange, symbol, timeframe, days):
-    """Fetch historical data for a single symbol and timeframe"""
+def get_file_path(symbol, timeframe):
     if '1000PEPE' in symbol:
         safe_symbol = 'PEPEUSDT'
     else:
         safe_symbol = symbol.split('/')[0] + "USDT"
-    filepath = os.path.join(DATA_DIR, f"{safe_symbol}_{timeframe}.csv")
-    
+    return os.path.join(DATA_DIR, f"{safe_symbol}_{timeframe}.csv")
+
+def resolve_since(filepath, symbol, timeframe, days, now_ms):
+    """Return the ms timestamp to resume from, or None if the file is already up to date"""
     # Check if exists and determine start time
     if os.path.exists(filepath):
-        try:
-            df_existing = pd.read_csv(filepath)
-            if not df_existing.empty and 'timestamp' in df_existing.columns:
-                last_ts = df_existing['timestamp'].iloc[-1]
-                start_time = datetime.fromtimestamp(last_ts / 1000)
-                logger.info(f"[{symbol} {timeframe}] Data exists. Last timestamp: {start_time}. Checking for updates...")
-                since = int(last_ts) + 1
-            else:
-                logger.warning(f"[{symbol} {timeframe}] File exists but is empty or invalid. Deleting and re-fetching.")
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-                
-                end_time = datetime.now()
-                start_time = end_time - timedelta(days=days)
-                since = int(start_time.timestamp() * 1000)
-        except Exception as e:
-            logger.error(f"[{symbol} {timeframe}] Error reading existing file: {e}. Deleting and re-fetching.")
-            if os.path.exists(filepath):
-                try:
-                    os.remove(filepath)
-                except OSError as err:
-                    logger.error(f"Error deleting file {filepath}: {err}")
+        # Only the tail of the file is read; the history itself never needs loading
+        last_ts = read_last_timestamp(filepath)
+        if last_ts is not None:
+            start_time = datetime.fromtimestamp(last_ts / 1000)
+            logger.info(f"[{symbol} {timeframe}] Data exists. Last timestamp: {start_time}. Checking for updates...")
+            since = last_ts + 1
+        else:
+            logger.warning(f"[{symbol} {timeframe}] File exists but is empty or invalid. Deleting and re-fetching.")
+            try:
+                os.remove(filepath)
+            except OSError as err:
+                logger.error(f"Error deleting file {filepath}: {err}")
             
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=days)
-            since = int(start_time.timestamp() * 1000)
+            since = now_ms - days * DAY_MS
     else:
         logger.info(f"[{symbol} {timeframe}] File not found. Downloading full history.")
-        end_time = datetime.now()
-        start_time = end_time - timedelta(days=days)
-        since = int(start_time.timestamp() * 1000)
+        since = now_ms - days * DAY_MS
 
     # If since is close to now, skip
-    if (datetime.now().timestamp() * 1000) - since < 60000 * 5: # Less than 5 mins gap
+    if now_ms - since < 60000 * 5: # Less than 5 mins gap
         logger.info(f"[{symbol} {timeframe}] Data is up to date. Skipping.")
+        return None
+    return since
+
+async def fetch_history_for_symbol(exchange, symbol, timeframe, days):
+    """Fetch historical data for a single symbol and timeframe"""
+    filepath = get_file_path(symbol, timeframe)
+    # One clock read serves the resume point, the up-to-date check and the loop's end limit
+    now_ms = int(time.time() * 1000)
+    # File I/O is blocking; keep it off the event loop
+    since = await asyncio.to_thread(resolve_since, filepath, symbol, timeframe, days, now_ms)
+    if since is None:
         return
 
-    all_ohlcv = []
+    writer = None
     
     logger.info(f"[{symbol} {timeframe}] Starting download from {datetime.fromtimestamp(since/1000)}")
     
-    end_ts_limit = int(datetime.now().timestamp() * 1000)
+    end_ts_limit = now_ms
     
     try:
         while True:
             # Fetch candles
             try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
+                ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
             except ccxt.NetworkError as e:
                 logger.warning(f"Network error for {symbol}: {e}. Retrying in 5s...")
-                time.sleep(5)
+                await asyncio.sleep(5)
                 continue
             except Exception as e:
                 logger.error(f"Error fetching {symbol}: {e}")
@@ -119,7 +141,10 @@ def fetch_history_for_symbol(exchange, symbol, timeframe, days):
             if not ohlcv:
                 break
                 
-            all_ohlcv.extend(ohlcv)
+            # Append each page as it arrives; since only moves forward so rows never overlap
+            if writer is None:
+                writer = await asyncio.to_thread(OhlcvCsvWriter, filepath, True)
+            await asyncio.to_thread(writer.write_batch, ohlcv)
             
             # Update since
             last_timestamp = ohlcv[-1][0]
@@ -129,44 +154,25 @@ def fetch_history_for_symbol(exchange, symbol, timeframe, days):
             if last_timestamp >= end_ts_limit:
                 break
             
-            # Sleep to be gentle
-            time.sleep(0.5) 
+            # ccxt's rate limiter paces requests; only back off when Binance reports heavy usage
+            await respect_weight_limit(exchange, symbol, timeframe)
             
             # Progress log
-            if len(all_ohlcv) % 10000 == 0:
-                 logger.info(f"[{symbol} {timeframe}] Downloaded {len(all_ohlcv)} candles...")
+            if writer.rows % 10000 == 0:
+                 logger.info(f"[{symbol} {timeframe}] Downloaded {writer.rows} candles...")
 
-        # Save to CSV
-        if all_ohlcv:
-            new_df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            new_df['datetime'] = pd.to_datetime(new_df['timestamp'], unit='ms')
-            
-            if os.path.exists(filepath):
-                try:
-                     df_existing = pd.read_csv(filepath)
-                     # Ensure timestamp is same type
-                     df_existing['timestamp'] = df_existing['timestamp'].astype(float)
-                     new_df['timestamp'] = new_df['timestamp'].astype(float)
-                     
-                     combined = pd.concat([df_existing, new_df])
-                     combined = combined.drop_duplicates(subset=['timestamp'], keep='last')
-                     combined = combined.sort_values(by='timestamp')
-                     
-                     combined.to_csv(filepath, index=False)
-                     logger.info(f"[{symbol} {timeframe}] Appended {len(new_df)} rows. Total: {len(combined)}")
-                except Exception as e:
-                     logger.error(f"[{symbol} {timeframe}] Error appending: {e}")
-                     # Fallback to overwrite if append fails? No, safe to not overwrite if error.
-            else:
-                new_df.to_csv(filepath, index=False)
-                logger.info(f"[{symbol} {timeframe}] Saved {len(new_df)} rows to {filepath}")
+        if writer:
+            logger.info(f"[{symbol} {timeframe}] Appended {writer.rows} rows to {filepath}")
         else:
             logger.warning(f"[{symbol} {timeframe}] No new data found.")
             
     except Exception as e:
         logger.error(f"Critical error fetching {symbol} {timeframe}: {e}")
+    finally:
+        if writer:
+            writer.close()
 
-def main():
+async def main():
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
         
@@ -174,17 +180,22 @@ def main():
     symbols = get_all_symbols()
     
     logger.info(f"Checking {len(symbols)} symbols for missing data...")
-    
-    for symbol in symbols:
-        for tf in TIMEFRAMES:
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+    async def bounded(symbol, tf):
+        async with sem:
             try:
-                fetch_history_for_symbol(exchange, symbol, tf, DAYS_TO_FETCH)
-                # Sleep between files to ensure low frequency
-                time.sleep(1)
+                await fetch_history_for_symbol(exchange, symbol, tf, DAYS_TO_FETCH)
             except Exception as e:
                 logger.error(f"Failed to process {symbol} {tf}: {e}")
+
+    try:
+        await asyncio.gather(*(bounded(symbol, tf) for symbol in symbols for tf in TIMEFRAMES))
+    finally:
+        await exchange.close()
                 
     logger.info("All download tasks completed.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
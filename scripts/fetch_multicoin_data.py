@@ -1,21 +1,35 @@
 import ccxt
-import pandas as pd
+import ccxt.async_support as ccxt_async
 import os
+import json
+import sys
 import time
+import asyncio
+import atexit
+import queue
 from datetime import datetime, timedelta
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.ohlcv_csv import OhlcvCsvWriter, read_last_timestamp
+from src.utils.rate_limit import AdaptiveRateLimiter
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("fetch_data.log"),
-        logging.StreamHandler()
-    ]
-)
+# Records are queued and written by a listener thread, so file/stdout I/O never blocks the download loop
+_log_handlers = [
+    logging.FileHandler("fetch_data.log"),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *_log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -23,65 +37,107 @@ DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__
 DAYS_TO_FETCH = 180
 TIMEFRAMES = ['1m', '5m', '1h']
 TOP_N = 10
-MAX_WORKERS = 5  # Conservative worker count to avoid rate limits
+UP_TO_DATE_MS = 5 * 60 * 1000  # Skip files whose last candle is newer than this
+MAX_CONCURRENT_DOWNLOADS = 10  # In-flight downloads on the shared client
+TOP_SYMBOLS_CACHE = os.path.join(DATA_DIR, 'top_symbols.json')
+TOP_SYMBOLS_TTL = 86400  # Volume ranking is refreshed once a day
 
 # Proxies (Optional: Load from env or config if needed, using hardcoded for now based on project memory)
 PROXY_URL = "http://127.0.0.1:33210"
-PROXIES = {
-    'http': PROXY_URL,
-    'https': PROXY_URL
-}
 
 def get_exchange():
-    """Initialize Binance Futures exchange connection"""
-    exchange = ccxt.binance({
+    """Initialize async Binance Futures exchange connection"""
+    exchange = ccxt_async.binance({
         'enableRateLimit': True,
         'options': {
             'defaultType': 'swap',
             'adjustForTimeDifference': True,
         },
-        'proxies': PROXIES,
+        'aiohttp_proxy': PROXY_URL,
         'timeout': 30000,
     })
     return exchange
 
+# Shared by all downloads: the weight budget is per IP
+limiter = AdaptiveRateLimiter()
+
+# Fallback when the volume ranking can't be fetched
+DEFAULT_SYMBOLS = [
+    'BTC/USDT:USDT', 'ETH/USDT:USDT', 'BNB/USDT:USDT', 'SOL/USDT:USDT', 'AVAX/USDT:USDT',
+    'XRP/USDT:USDT', 'DOGE/USDT:USDT', 'ADA/USDT:USDT', 'TRX/USDT:USDT', 'LINK/USDT:USDT',
+    'LTC/USDT:USDT', 'DOT/USDT:USDT', 'BCH/USDT:USDT', 'SHIB/USDT:USDT', 'MATIC/USDT:USDT',
+    'NEAR/USDT:USDT', 'APT/USDT:USDT', 'FIL/USDT:USDT', 'ATOM/USDT:USDT', 'ARB/USDT:USDT',
+    'OP/USDT:USDT', 'ETC/USDT:USDT', 'ICP/USDT:USDT', 'RNDR/USDT:USDT', 'INJ/USDT:USDT',
+    'STX/USDT:USDT', 'LDO/USDT:USDT', 'VET/USDT:USDT', 'XLM/USDT:USDT', 'PEPE/USDT:USDT'
+]
+
+def rank_symbols_by_volume():
+    """All USDT-margined swaps, highest 24h quote volume first (one fetch_tickers call)"""
+    exchange = ccxt.binance({
+        'enableRateLimit': True,
+        'options': {'defaultType': 'swap'},
+        'proxies': {'http': PROXY_URL, 'https': PROXY_URL},
+        'timeout': 30000,
+    })
+    tickers = exchange.fetch_tickers()
+    ranked = sorted(tickers.values(), key=lambda t: t.get('quoteVolume') or 0, reverse=True)
+    return [t['symbol'] for t in ranked if t['symbol'].endswith('/USDT:USDT')]
+
 def get_top_volume_symbols(limit=30):
-    """Return Top 30 Mainstream Coins"""
-    # Expanded list
-    symbols = [
-        'BTC/USDT:USDT', 'ETH/USDT:USDT', 'BNB/USDT:USDT', 'SOL/USDT:USDT', 'AVAX/USDT:USDT',
-        'XRP/USDT:USDT', 'DOGE/USDT:USDT', 'ADA/USDT:USDT', 'TRX/USDT:USDT', 'LINK/USDT:USDT',
-        'LTC/USDT:USDT', 'DOT/USDT:USDT', 'BCH/USDT:USDT', 'SHIB/USDT:USDT', 'MATIC/USDT:USDT',
-        'NEAR/USDT:USDT', 'APT/USDT:USDT', 'FIL/USDT:USDT', 'ATOM/USDT:USDT', 'ARB/USDT:USDT',
-        'OP/USDT:USDT', 'ETC/USDT:USDT', 'ICP/USDT:USDT', 'RNDR/USDT:USDT', 'INJ/USDT:USDT',
-        'STX/USDT:USDT', 'LDO/USDT:USDT', 'VET/USDT:USDT', 'XLM/USDT:USDT', 'PEPE/USDT:USDT'
-    ]
+    """Return the Top N USDT perpetuals by 24h quote volume, cached on disk for a day"""
+    ranked = None
+    try:
+        if time.time() - os.path.getmtime(TOP_SYMBOLS_CACHE) < TOP_SYMBOLS_TTL:
+            with open(TOP_SYMBOLS_CACHE) as f:
+                ranked = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if not ranked:
+        try:
+            ranked = rank_symbols_by_volume()
+            os.makedirs(DATA_DIR, exist_ok=True)
+            with open(TOP_SYMBOLS_CACHE, 'w') as f:
+                json.dump(ranked, f)
+        except Exception as e:
+            logger.warning(f"Volume ranking unavailable ({e}); using default symbol list.")
+            ranked = DEFAULT_SYMBOLS
+
+    symbols = ranked[:limit]
     logger.info(f"Selected Top {len(symbols)} Coins: {symbols}")
     return symbols
 
-def fetch_history_for_symbol(symbol, timeframe, days):
+async def download_history(exchange, symbol, timeframe, days):
     """Fetch historical data for a single symbol and timeframe"""
-    exchange = get_exchange()
     # Create symbol-specific directory or just use raw root
     # Using raw root with filename convention: {Symbol}_{Timeframe}.csv
     # Sanitize symbol for filename (BTC/USDT:USDT -> BTCUSDT)
     safe_symbol = symbol.split('/')[0] + "USDT"
     filepath = os.path.join(DATA_DIR, f"{safe_symbol}_{timeframe}.csv")
     
-    # Check if exists and recent
-    if os.path.exists(filepath):
-        mtime = os.path.getmtime(filepath)
-        # If less than 24 hours old, skip
-        if (time.time() - mtime) < 86400:
-            logger.info(f"[{symbol} {timeframe}] Data recent (skipping).")
-            return
-    
-    # Calculate start time
-    end_time = datetime.now()
-    start_time = end_time - timedelta(days=days)
-    since = int(start_time.timestamp() * 1000)
+    now_ms = int(time.time() * 1000)
+    end_ts_limit = now_ms
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    tmp_path = filepath + '.tmp'
     
-    all_ohlcv = []
+    # Resume from the last stored candle when the file exists, so a refresh only costs the delta
+    last_ts = await asyncio.to_thread(read_last_timestamp, filepath)
+    if last_ts is not None:
+        # Nothing to do until the candle after the stored one has closed
+        if now_ms - last_ts < UP_TO_DATE_MS or last_ts + 2 * tf_ms > now_ms:
+            logger.info(f"[{symbol} {timeframe}] Data is up to date (skipping).")
+            return filepath
+        since = last_ts + 1
+        start_time = datetime.fromtimestamp(since / 1000)
+        write_path = filepath
+        writer = await asyncio.to_thread(OhlcvCsvWriter, filepath, True)
+    else:
+        # Calculate start time
+        start_time = datetime.now() - timedelta(days=days)
+        since = int(start_time.timestamp() * 1000)
+        # Stream pages into a temp file and swap it in once complete, so only one page is in memory
+        write_path = tmp_path
+        writer = await asyncio.to_thread(OhlcvCsvWriter, tmp_path)
     
     logger.info(f"[{symbol} {timeframe}] Starting download from {start_time}")
     
@@ -89,10 +145,14 @@ def fetch_history_for_symbol(symbol, timeframe, days):
         while True:
             # Fetch candles
             try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
+                ohlcv = await limiter.execute_async(exchange.fetch_ohlcv, symbol, timeframe, since=since, limit=1000)
+            except ccxt.DDoSProtection as e:
+                # Limiter already backed off max_attempts times; DDoSProtection is a NetworkError, so stop here
+                logger.error(f"Still rate limited for {symbol}: {e}. Giving up.")
+                break
             except ccxt.NetworkError as e:
                 logger.warning(f"Network error for {symbol}: {e}. Retrying in 5s...")
-                time.sleep(5)
+                await asyncio.sleep(5)
                 continue
             except Exception as e:
                 logger.error(f"Error fetching {symbol}: {e}")
@@ -101,42 +161,52 @@ def fetch_history_for_symbol(symbol, timeframe, days):
             if not ohlcv:
                 break
             
-            all_ohlcv.extend(ohlcv)
+            # The newest kline is still forming; appended rows are never rewritten, so keep only closed candles
+            closed = [c for c in ohlcv if c[0] + tf_ms <= now_ms]
+            if closed:
+                # File I/O is blocking; keep it off the event loop
+                await asyncio.to_thread(writer.write_batch, closed)
             
             # Update 'since' to the timestamp of the last candle + 1ms
             last_timestamp = ohlcv[-1][0]
             since = last_timestamp + 1
             
             # Check if we've reached current time
-            if last_timestamp >= int(end_time.timestamp() * 1000):
+            if last_timestamp >= end_ts_limit:
                 break
-                
-            # Progress log every ~5000 candles
-            if len(all_ohlcv) % 5000 == 0:
-                logger.info(f"[{symbol} {timeframe}] Fetched {len(all_ohlcv)} candles...")
-                
-            # Rate limit sleep (ccxt handles it but being safe for parallel)
-            time.sleep(0.5)
             
-        if not all_ohlcv:
+        writer.close()
+        if write_path == filepath:
+            logger.info(f"[{symbol} {timeframe}] Appended {writer.rows} rows to {filepath}")
+            return filepath
+        if not writer.rows:
             logger.warning(f"[{symbol} {timeframe}] No data fetched.")
             return None
 
-        # Convert to DataFrame
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-        
         # Save to CSV
-        df.to_csv(filepath, index=False)
-        logger.info(f"[{symbol} {timeframe}] Saved {len(df)} rows to {filepath}")
+        os.replace(tmp_path, filepath)
+        logger.info(f"[{symbol} {timeframe}] Saved {writer.rows} rows to {filepath}")
         return filepath
         
     except Exception as e:
         logger.error(f"[{symbol} {timeframe}] Failed: {e}")
         return None
-    # No close() needed for sync ccxt
+    finally:
+        writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-def main():
+def fetch_history_for_symbol(symbol, timeframe, days):
+    """Blocking single download with its own client, for callers outside an event loop"""
+    async def run():
+        exchange = get_exchange()
+        try:
+            return await download_history(exchange, symbol, timeframe, days)
+        finally:
+            await exchange.close()
+    return asyncio.run(run())
+
+async def main_async():
     # Ensure data directory exists
     os.makedirs(DATA_DIR, exist_ok=True)
     
@@ -151,23 +221,29 @@ def main():
             
     logger.info(f"Prepared {len(tasks)} download tasks (Symbols: {len(symbols)}, Timeframes: {len(TIMEFRAMES)})")
     
-    # 3. Execute concurrently
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(fetch_history_for_symbol, symbol, tf, DAYS_TO_FETCH): (symbol, tf)
-            for symbol, tf in tasks
-        }
-        
-        for future in as_completed(futures):
-            symbol, tf = futures[future]
-            try:
-                result = future.result()
-                if result:
-                    print(f"✅ Completed: {symbol} {tf}")
-                else:
-                    print(f"❌ Failed: {symbol} {tf}")
-            except Exception as e:
-                print(f"❌ Exception for {symbol} {tf}: {e}")
+    # 3. Execute concurrently on one client (one aiohttp keep-alive pool)
+    exchange = get_exchange()
+    sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+    async def bounded(symbol, tf):
+        async with sem:
+            return await download_history(exchange, symbol, tf, DAYS_TO_FETCH)
+
+    try:
+        results = await asyncio.gather(*(bounded(symbol, tf) for symbol, tf in tasks), return_exceptions=True)
+    finally:
+        await exchange.close()
+
+    for (symbol, tf), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"❌ Exception for {symbol} {tf}: {result}")
+        elif result:
+            print(f"✅ Completed: {symbol} {tf}")
+        else:
+            print(f"❌ Failed: {symbol} {tf}")
+
+def main():
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
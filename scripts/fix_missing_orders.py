@@ -4,10 +4,11 @@ import os
 import json
 import logging
 import traceback
-from pprint import pprint
 
 import time
 
+import orjson
+
 # Add src to python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -17,6 +18,9 @@ from src.trader.real_trader import RealTrader
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Diagnostics (dummy order, global order scans, waits) cost extra round-trips; opt in with DEBUG_ORDERS=1
+DEBUG = os.getenv('DEBUG_ORDERS') == '1'
+
 def load_config():
     config_path = os.path.join(os.path.dirname(__file__), '../trader_config.json')
     if os.path.exists(config_path):
@@ -57,6 +61,10 @@ def main():
         
         # Force load markets
         trader.exchange.load_markets()
+        # Exchange id -> unified symbol, built once; first market wins, as the old linear scan did
+        id_index = {}
+        for m_key, m_val in trader.exchange.markets.items():
+            id_index.setdefault(m_val['id'], m_key)
             
         print("✅ Exchange initialized successfully!")
         
@@ -66,61 +74,64 @@ def main():
             print("No open positions found.")
             return
 
-        # DEBUG: Fetch ALL open orders to see if they exist under different symbols
-        print("   [DEBUG] Fetching ALL open orders (no symbol filter)...")
-        try:
-            all_open = trader.exchange.fetch_open_orders()
-            print(f"   [DEBUG] Found {len(all_open)} total open orders.")
-            for o in all_open:
-                 print(f"     > Sym: {o['symbol']} | ID: {o['id']} | Type: {o['type']} | Status: {o['status']}")
-        except Exception as e:
-            print(f"   [DEBUG] Failed to fetch all open orders: {e}")
+        if DEBUG:
+            # DEBUG: Fetch ALL open orders to see if they exist under different symbols
+            print("   [DEBUG] Fetching ALL open orders (no symbol filter)...")
+            try:
+                all_open = trader.exchange.fetch_open_orders()
+                print(f"   [DEBUG] Found {len(all_open)} total open orders.")
+                for o in all_open:
+                     print(f"     > Sym: {o['symbol']} | ID: {o['id']} | Type: {o['type']} | Status: {o['status']}")
+            except Exception as e:
+                print(f"   [DEBUG] Failed to fetch all open orders: {e}")
 
+        repairs = []
         for sym, pos in positions.items():
             print(f"\nProcessing {sym} ({pos['side']})...")
             
-            # Test Mode: Only process SOL
-            if "SOL" not in sym:
-                 continue
+            if DEBUG:
+                # Test Mode: Only process SOL
+                if "SOL" not in sym:
+                     continue
 
-            # DEBUG: Place a plain LIMIT order (Far away)
-            print("   [DEBUG] Placing a dummy LIMIT order (Buy SOL at $10)...")
-            try:
-                # Use strict symbol resolution for dummy order
-                dummy_sym = sym
+                # DEBUG: Place a plain LIMIT order (Far away)
+                print("   [DEBUG] Placing a dummy LIMIT order (Buy SOL at $10)...")
+                try:
+                    # Use strict symbol resolution for dummy order
+                    dummy_sym = sym
                 
-                # 0.2 SOL * $10 = $2 (Too small). Need > $5.
-                # Use 0.6 SOL * $10 = $6.
-                dummy_order = trader.exchange.create_order(dummy_sym, 'LIMIT', 'buy', 0.6, price=10.0)
-                print(f"   [DEBUG] Dummy Order Response: {json.dumps(dummy_order, default=str)}")
-                print("   [DEBUG] Checking if dummy order exists in open orders...")
-                time.sleep(2)
+                    # 0.2 SOL * $10 = $2 (Too small). Need > $5.
+                    # Use 0.6 SOL * $10 = $6.
+                    dummy_order = trader.exchange.create_order(dummy_sym, 'LIMIT', 'buy', 0.6, price=10.0)
+                    print(f"   [DEBUG] Dummy Order Response: {orjson.dumps(dummy_order, default=str, option=orjson.OPT_NON_STR_KEYS).decode()}")
+                    print("   [DEBUG] Checking if dummy order exists in open orders...")
+                    time.sleep(2)
                 
-                # Check specific symbol
-                open_orders = trader.exchange.fetch_open_orders(dummy_sym)
-                found_dummy = False
-                for o in open_orders:
-                    print(f"     [DEBUG Check] ID: {o['id']}, Type: {o['type']}, Status: {o['status']}")
-                    if str(o['id']) == str(dummy_order['id']):
-                        found_dummy = True
-                        print("   [DEBUG] ✅ Dummy Order FOUND in Open Orders!")
-                        # Cancel it
-                        trader.exchange.cancel_order(o['id'], dummy_sym)
-                        print("   [DEBUG] Dummy Order Cancelled.")
+                    # Check specific symbol
+                    open_orders = trader.exchange.fetch_open_orders(dummy_sym)
+                    found_dummy = False
+                    for o in open_orders:
+                        print(f"     [DEBUG Check] ID: {o['id']}, Type: {o['type']}, Status: {o['status']}")
+                        if str(o['id']) == str(dummy_order['id']):
+                            found_dummy = True
+                            print("   [DEBUG] ✅ Dummy Order FOUND in Open Orders!")
+                            # Cancel it
+                            trader.exchange.cancel_order(o['id'], dummy_sym)
+                            print("   [DEBUG] Dummy Order Cancelled.")
                 
-                if not found_dummy:
-                    print("   [DEBUG] ❌ Dummy Order NOT FOUND in Open Orders!")
-                    # Check ALL again
-                    try:
-                        all_open_again = trader.exchange.fetch_open_orders()
-                        for o in all_open_again:
-                             if str(o['id']) == str(dummy_order['id']):
-                                  print(f"   [DEBUG] ⚠️ FOUND in Global list under symbol: {o['symbol']}")
-                    except:
-                        pass
+                    if not found_dummy:
+                        print("   [DEBUG] ❌ Dummy Order NOT FOUND in Open Orders!")
+                        # Check ALL again
+                        try:
+                            all_open_again = trader.exchange.fetch_open_orders()
+                            for o in all_open_again:
+                                 if str(o['id']) == str(dummy_order['id']):
+                                      print(f"   [DEBUG] ⚠️ FOUND in Global list under symbol: {o['symbol']}")
+                        except:
+                            pass
                     
-            except Exception as e:
-                print(f"   [DEBUG] Failed to place dummy order: {e}")
+                except Exception as e:
+                    print(f"   [DEBUG] Failed to place dummy order: {e}")
 
         # Clean symbol for orders (remove :USDT if present)
             # order_sym = sym.split(':')[0] 
@@ -132,14 +143,12 @@ def main():
                 print(f"   Symbol {sym} found in markets.")
             else:
                 print(f"   Symbol {sym} NOT found in markets. Trying to resolve...")
-                found = False
-                for m_key, m_val in trader.exchange.markets.items():
-                    if m_val['id'] == sym.replace('/', '').replace(':USDT', '') or m_key == sym.split(':')[0]:
-                         print(f"   Resolved {sym} -> {m_key}")
-                         order_sym = m_key
-                         found = True
-                         break
-                if not found:
+                base_sym = sym.split(':')[0]
+                m_key = id_index.get(sym.replace('/', '').replace(':USDT', '')) or (base_sym if base_sym in trader.exchange.markets else None)
+                if m_key:
+                    print(f"   Resolved {sym} -> {m_key}")
+                    order_sym = m_key
+                else:
                     print(f"   Could not resolve {sym}, using original.")
 
             print(f"   Using order symbol: {order_sym}")
@@ -190,154 +199,99 @@ def main():
                     
                 sl_side = 'buy'
 
-            # Place Orders if not closed
-            try:
-                # DEBUG: Print Full Order Response
-                
-                # Manual Fetch and Cancel
-                print(f"   Fetching open orders for {order_sym}...")
-                existing_orders = trader.exchange.fetch_open_orders(order_sym)
-                if existing_orders:
-                    print(f"   Found {len(existing_orders)} existing orders. Cancelling individually...")
-                    for o in existing_orders:
-                        print(f"     - Cancelling Order ID: {o['id']} (Type: {o['type']}, Stop: {o.get('stopPrice')})")
-                        try:
-                            trader.exchange.cancel_order(o['id'], order_sym)
-                            print("       ✅ Cancelled.")
-                        except Exception as ce:
-                            print(f"       ❌ Failed to cancel: {ce}")
-                    
-                    print("   Waiting 2s...")
-                    time.sleep(2)
-                else:
-                    print("   No existing orders found via fetch_open_orders.")
+            # Queue the repair; orders for every position go out together after the scan
+            repairs.append((order_sym, sl_side, abs(amount), target_sl, target_tp))
 
-                # Place SL (STOP_MARKET)
-                # Note: Binance Futures SL/TP logic
-                # For Long: SL is Sell Stop Market below price. TP is Sell Take Profit Market above price.
-                
-                # 1. SL
-                print(f"   Placing SL at {target_sl:.4f}...")
-                try:
-                    # Check current price first to avoid immediate trigger
-                    ticker = trader.exchange.fetch_ticker(order_sym)
-                    current_price = ticker['last']
-                    print(f"   [Price Check] Current: {current_price}, SL Target: {target_sl}")
-                    
-                    if (amount > 0 and target_sl >= current_price) or (amount < 0 and target_sl <= current_price):
-                         print("   [WARNING] SL Price might trigger immediately! Adjusting slightly for test if needed or skipping.")
-                    
-                    sl_order = trader.exchange.create_order(order_sym, 'STOP_MARKET', sl_side, abs(amount), params={
-                        'stopPrice': trader.exchange.price_to_precision(order_sym, target_sl),
-                        'reduceOnly': True,
-                        'workingType': 'MARK_PRICE' # Explicitly set working type
-                    })
-                    print(f"   >>> SL Order Created. ID: {sl_order['id']}")
-                    print(f"   >>> Full Response: {json.dumps(sl_order, default=str)}")
-                    
-                    # Immediate check with fetch_order
-                    time.sleep(2)
-                    try:
-                        print(f"   >>> Fetching GLOBAL open orders (no symbol filter)...")
-                        all_open = trader.exchange.fetch_open_orders()
-                        found_global = False
-                        for o in all_open:
-                            if str(o['id']) == str(sl_order['id']) or (o.get('info', {}).get('algoId') == str(sl_order['id'])):
-                                found_global = True
-                                print(f"      ✅ MATCH FOUND in Global! Symbol: {o['symbol']}, ID: {o['id']}")
-                        
-                        if not found_global:
-                             print(f"   >>> ❌ Order {sl_order['id']} NOT found in GLOBAL open orders.")
-                    except Exception as e:
-                        print(f"   >>> ❌ Failed to fetch global orders: {e}")
+        if not repairs:
+            print("\nNothing to repair.")
+            return
 
-                    # DEBUG: Try Raw Private API Calls
-                    print("   [DEBUG] Trying Raw Private API Calls...")
-                    try:
-                        raw_symbol = order_sym.replace('/', '').replace(':USDT', '') # SOLUSDT
-                        
-                        # 1. /fapi/v1/openOrders
-                        print(f"   Invoking fapiPrivateGetOpenOrders for {raw_symbol}...")
-                        raw_open = trader.exchange.fapiPrivateGetOpenOrders({'symbol': raw_symbol})
-                        print(f"   Found {len(raw_open)} raw open orders.")
-                        
-                        # 2. /fapi/v1/allOrders (History)
-                        print(f"   Invoking fapiPrivateGetAllOrders for {raw_symbol} (limit=5)...")
-                        raw_history = trader.exchange.fapiPrivateGetAllOrders({'symbol': raw_symbol, 'limit': 5})
-                        for o in raw_history:
-                             print(f"     Hist Order: ID={o.get('orderId')}, AlgoID={o.get('algoId')}, Type={o.get('type')}, Status={o.get('status')}, WorkingType={o.get('workingType')}")
-                             if str(o.get('orderId')) == str(sl_order['id']) or str(o.get('algoId')) == str(sl_order['id']):
-                                  print("     ✅ MATCH FOUND in fapiPrivateGetAllOrders!")
-                                  print(f"     Full Hist Info: {json.dumps(o, default=str)}")
+        # 1. One ticker request for every symbol being repaired
+        repair_syms = [r[0] for r in repairs]
+        try:
+            tickers = trader.exchange.fetch_tickers(repair_syms)
+        except Exception as e:
+            print(f"   [Price Check] Failed to fetch tickers: {e}")
+            tickers = {}
+        for order_sym, sl_side, amount, target_sl, target_tp in repairs:
+            last = (tickers.get(order_sym) or {}).get('last')
+            print(f"   [Price Check] {order_sym} Current: {last}, SL Target: {target_sl}")
+            if last and ((sl_side == 'sell' and target_sl >= last) or (sl_side == 'buy' and target_sl <= last)):
+                print(f"   [WARNING] {order_sym} SL Price might trigger immediately!")
 
-                        # 3. /fapi/v1/algo/openOrders (Algo)
-                        print(f"   Invoking fapiPrivateGetOpenAlgoOrders for {raw_symbol}...")
-                        # Note: Endpoint might be fapiPrivateGetAlgoOpenOrders or fapiPrivateGetOpenAlgoOrders depending on CCXT mapping
-                        # Based on find_algo_methods.py: fapiPrivateGetOpenAlgoOrders
-                        raw_algo = trader.exchange.fapiPrivateGetOpenAlgoOrders({'symbol': raw_symbol}) # or fapiPrivateGetAlgoOpenOrders
-                        print(f"   Found {len(raw_algo)} raw algo orders.")
-                        for o in raw_algo:
-                             print(f"     Algo Order: ID={o.get('orderId')}, AlgoID={o.get('algoId')}, Type={o.get('type')}, Status={o.get('status')}")
-                             if str(o.get('algoId')) == str(sl_order['id']):
-                                  print("     ✅ MATCH FOUND in fapiPrivateGetOpenAlgoOrders!")
-                                  print(f"     Full Algo Info: {json.dumps(o, default=str)}")
-                        
-                    except Exception as e:
-                        print(f"   Failed raw API call: {e}")
+        # 2. Clear existing orders with one cancelAllOpenOrders call per symbol
+        for order_sym in repair_syms:
+            try:
+                trader.exchange.cancel_all_orders(order_sym)
+                print(f"   Cancelled existing orders for {order_sym}.")
+            except Exception as e:
+                print(f"   No orders cancelled for {order_sym}: {e}")
+        if DEBUG:
+            print("   Waiting 2s...")
+            time.sleep(2)
 
-                    # Check Trades (Execution)
+        # 3. Place every SL/TP; conditional orders go to the algo order endpoint, one create_order each
+        # Note: Binance Futures SL/TP logic
+        # For Long: SL is Sell Stop Market below price. TP is Sell Take Profit Market above price.
+        orders = []
+        for order_sym, sl_side, amount, target_sl, target_tp in repairs:
+            orders.append({
+                'symbol': order_sym, 'type': 'STOP_MARKET', 'side': sl_side, 'amount': amount,
+                'params': {
+                    'stopPrice': trader.exchange.price_to_precision(order_sym, target_sl),
+                    'reduceOnly': True,
+                    'workingType': 'MARK_PRICE' # Explicitly set working type
+                }
+            })
+            orders.append({
+                'symbol': order_sym, 'type': 'TAKE_PROFIT_MARKET', 'side': sl_side, 'amount': amount,
+                'params': {
+                    'stopPrice': trader.exchange.price_to_precision(order_sym, target_tp),
+                    'reduceOnly': True
+                }
+            })
 
-                    # Check Trades (Execution)
-                    print(f"   >>> Checking recent trades for {order_sym}...")
-                    try:
-                        trades = trader.exchange.fetch_my_trades(order_sym, limit=5)
-                        for t in trades:
-                            if str(t['order']) == str(sl_order['id']):
-                                print(f"   >>> ⚠️ Order EXECUTED immediately! Trade: {t}")
-                    except Exception as e:
-                        print(f"   >>> Failed to fetch trades: {e}")
+        def place(order):
+            label = 'SL' if order['type'] == 'STOP_MARKET' else 'TP'
+            try:
+                result = trader.exchange.create_order(order['symbol'], order['type'], order['side'], order['amount'], params=order['params'])
+            except Exception as e:
+                print(f"   !!! {order['symbol']} {label} Placement Failed: {e}")
+                return None
+            print(f"   >>> {order['symbol']} {label} Created at {order['params']['stopPrice']}. ID: {result.get('id')}")
+            return result
 
-                except Exception as e:
-                    print(f"   !!! SL Placement Failed: {e}")
-                
-                # 2. TP
-                print(f"   Placing TP at {target_tp:.4f}...")
-                try:
-                    tp_order = trader.exchange.create_order(order_sym, 'TAKE_PROFIT_MARKET', sl_side, amount, params={
-                        'stopPrice': trader.exchange.price_to_precision(order_sym, target_tp),
-                        'reduceOnly': True
-                    })
-                    print(f"   >>> TP Order Result JSON: {json.dumps(tp_order, default=str)}")
-        
-                    # Immediate check
-                    time.sleep(2)
-                    print(f"   >>> Fetching recent history for {order_sym}...")
-                    try:
-                        recent_orders = trader.exchange.fetch_orders(order_sym, limit=10)
-                        found = False
-                        for o in recent_orders:
-                            print(f"      - ID: {o['id']}, Status: {o['status']}, Type: {o['type']}, Side: {o['side']}, Stop: {o.get('stopPrice')}")
-                            if str(o['id']) == str(tp_order['id']):
-                                found = True
-                                print(f"        MATCH FOUND! Info: {o.get('info')}")
-                        
-                        if not found:
-                            print(f"   >>> ❌ Order {tp_order['id']} NOT found in recent history!")
-        
-                    except Exception as e:
-                        print(f"   >>> Failed to fetch history: {e}")
-        
-                except Exception as e:
-                     print(f"   !!! TP Placement Failed: {e}")
-                
-                print(f"✅ Fixed {order_sym}. New SL: {target_sl:.4f}, New TP: {target_tp:.4f}")
-                
+        # Sequential: the trader's sync ccxt instance isn't safe to share across threads
+        placed_ids = {}
+        for order in orders:
+            result = place(order)
+            if result and result.get('id'):
+                placed_ids[str(result['id'])] = (order['symbol'], 'SL' if order['type'] == 'STOP_MARKET' else 'TP')
+
+        # 4. Verify with a single global open-orders fetch
+        if DEBUG:
+            time.sleep(2)
+            try:
+                print("   >>> Fetching GLOBAL open orders (no symbol filter)...")
+                open_ids = set()
+                for o in trader.exchange.fetch_open_orders():
+                    open_ids.add(str(o['id']))
+                    open_ids.add(str(o.get('info', {}).get('algoId')))
+                for order_id, (order_sym, label) in placed_ids.items():
+                    if order_id in open_ids:
+                        print(f"      ✅ {order_sym} {label} {order_id} found in open orders.")
+                    else:
+                        print(f"      ❌ {order_sym} {label} {order_id} NOT found in open orders.")
             except Exception as e:
-                print(f"❌ Failed to place orders for {order_sym}: {e}")
+                print(f"   >>> ❌ Failed to fetch global orders: {e}")
+
+        for order_sym, _, _, target_sl, target_tp in repairs:
+            print(f"✅ Fixed {order_sym}. New SL: {target_sl:.4f}, New TP: {target_tp:.4f}")
 
     except Exception as e:
         print(f"❌ CRITICAL ERROR: {e}")
-        traceback.print_exc()
+        if DEBUG:
+            traceback.print_exc()
 
 if __name__ == "__main__":
     main()
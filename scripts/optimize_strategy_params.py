@@ -3,6 +3,8 @@ import sys
 import os
 import logging
 import itertools
+from concurrent.futures import ProcessPoolExecutor
+import optuna
 import pandas as pd
 from datetime import datetime
 
@@ -15,23 +17,51 @@ from src.utils.config_manager import config_manager
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Search space (ML threshold and risk/reward, high frequency)
+N_TRIALS = 48
+# Capped so TPE gets several rounds of feedback; one huge batch would degrade to random search
+BATCH_SIZE = max(1, min(os.cpu_count() or 1, N_TRIALS // 4))
+EMA_PERIODS = [100, 200]  # Try faster EMA too
+RSI_PERIODS = [14]  # Keep standard for now
+
+def suggest_params(trial):
+    # Rounded so recommended_config.json gets clean values off the step grid
+    return {
+        'ml_threshold': round(trial.suggest_float('ml_threshold', 0.6, 0.9, step=0.01), 2),
+        'stop_loss': round(trial.suggest_float('stop_loss', 0.005, 0.03, step=0.001), 3),
+        'take_profit': round(trial.suggest_float('take_profit', 0.01, 0.05, step=0.005), 3),  # Aim for 1:2 or 1:3 RR
+        'ema_period': trial.suggest_categorical('ema_period', EMA_PERIODS),
+        'rsi_period': trial.suggest_categorical('rsi_period', RSI_PERIODS),
+    }
+
+# Per-process state, set once by _init_worker
+_worker = {}
+
+def _init_worker(symbol, indicator_frames):
+    _worker['backtester'] = SmartBacktester(initial_capital=1000.0, symbol=symbol)
+    _worker['frames'] = indicator_frames
+
+def evaluate(params):
+    """Simulate one grid point on the prepared frame; returns (params, result, error)"""
+    try:
+        backtester = _worker['backtester']
+        backtester.strategy.ema_period = params['ema_period']
+        backtester.strategy.rsi_period = params['rsi_period']
+        # ml_threshold, SL and TP only affect the simulation
+        res = backtester._simulate(
+            _worker['frames'][(params['ema_period'], params['rsi_period'])],
+            params['ml_threshold'],
+            stop_loss=params['stop_loss'],
+            take_profit=params['take_profit']
+        )
+        return params, res, None
+    except Exception as e:
+        return params, None, str(e)
+
 def run_optimization(days=30, symbol='BTCUSDT'):
     print(f"\n{'='*20} Running Strategy Parameter Optimization ({days} Days) {'='*20}")
     
-    # Define Parameter Grid
-    # Focused on ML Threshold and Risk/Reward Ratio (High Frequency)
-    param_grid = {
-        'ml_threshold': [0.65, 0.75, 0.85],
-        'stop_loss': [0.01, 0.015, 0.02],
-        'take_profit': [0.02, 0.03, 0.04], # Aim for 1:2 or 1:3 RR
-        'ema_period': [100, 200], # Try faster EMA too
-        'rsi_period': [14]   # Keep standard for now
-    }
-    
-    keys = param_grid.keys()
-    combinations = list(itertools.product(*param_grid.values()))
-    
-    print(f"Testing {len(combinations)} parameter combinations...")
+    print(f"Running {N_TRIALS} TPE trials (batches of {BATCH_SIZE})...")
     
     best_result = None
     best_params = None
@@ -39,54 +69,67 @@ def run_optimization(days=30, symbol='BTCUSDT'):
     
     results_log = []
     
-    # Initialize Backtester once to load data (optimization)
-    # Note: SmartBacktester loads data in run(), so we might reload data each time unless we optimize that.
-    # For now, let's just instantiate inside loop or rely on caching if implemented.
-    # Actually, SmartBacktester fetches data in run(). To avoid re-fetching, we should hack it or modify it.
-    # The Collector has caching, so repeated calls should be fast after first one.
-    
-    # Pre-warm cache
+    # Data, features and ML probabilities don't depend on any searched parameter:
+    # fetch and prepare them once, like SmartBacktester.run_sensitivity_analysis does
     print("Pre-fetching data...")
-    temp_tester = SmartBacktester(symbol=symbol)
-    temp_tester.collector.fetch_historical_data(timeframe='5m', days=days)
+    backtester = SmartBacktester(initial_capital=1000.0, symbol=symbol)
+    df = backtester.collector.fetch_historical_data(timeframe='5m', days=days)
+    if df.empty:
+        print("No data fetched for optimization.")
+        return
+    base_df = backtester._prepare_data(df)
+    if base_df is None or base_df.empty:
+        print("Data preparation failed.")
+        return
     
+    # Indicators only depend on (ema_period, rsi_period); compute each frame once
+    indicator_frames = {}
+    for ema_period, rsi_period in itertools.product(EMA_PERIODS, RSI_PERIODS):
+        backtester.strategy.ema_period = ema_period
+        backtester.strategy.rsi_period = rsi_period
+        indicator_frames[(ema_period, rsi_period)] = backtester.strategy.calculate_indicators(base_df.copy())
+    
+    # TPE replaces the exhaustive grid; constant_liar keeps a batch of pending trials from
+    # all landing on the same point
+    study = optuna.create_study(
+        direction='maximize',
+        sampler=optuna.samplers.TPESampler(seed=42, constant_liar=True)
+    )
+    
+    # Each simulation is an independent pure-Python loop: evaluate a batch of asked trials
+    # across processes, then tell the results back. Frames reach each worker once via the initializer.
     count = 0
-    for values in combinations:
-        count += 1
-        params = dict(zip(keys, values))
-        
-        # Skip invalid RR (TP should be > SL)
-        if params['take_profit'] <= params['stop_loss']:
-            continue
-            
-        print(f"\n[{count}/{len(combinations)}] Testing: {params}")
-        
-        try:
-            # Update Strategy Config (Mocking or setting directly)
-            # We need to set these on the strategy instance inside backtester
+    with ProcessPoolExecutor(
+        max_workers=BATCH_SIZE,
+        initializer=_init_worker,
+        initargs=(symbol, indicator_frames)
+    ) as pool:
+        while len(study.trials) < N_TRIALS:
+            batch = []
+            for _ in range(min(BATCH_SIZE, N_TRIALS - len(study.trials))):
+                trial = study.ask()
+                params = suggest_params(trial)
+                # Skip invalid RR (TP should be > SL)
+                if params['take_profit'] <= params['stop_loss']:
+                    study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+                else:
+                    batch.append((trial, params))
             
-            backtester = SmartBacktester(initial_capital=1000.0, symbol=symbol)
-            
-            # Apply params
-            backtester.strategy.ema_period = params['ema_period']
-            backtester.strategy.rsi_period = params['rsi_period']
-            # ml_threshold is passed to run()
-            
-            # Run Backtest
-            res = backtester.run(
-                days=days, 
-                timeframe='5m',
-                confidence_threshold=params['ml_threshold'],
-                stop_loss=params['stop_loss'],
-                take_profit=params['take_profit']
-            )
-            
-            if res:
+            results = pool.map(evaluate, [params for _, params in batch])
+            for (trial, _), (params, res, error) in zip(batch, results):
+                count += 1
+                print(f"\n[{count}] Tested: {params}")
+                if error or not res:
+                    print(f"Error: {error}")
+                    study.tell(trial, state=optuna.trial.TrialState.FAIL)
+                    continue
+                
                 final_bal = res['final_balance']
                 profit = final_bal - 1000
                 ret_pct = (profit / 1000) * 100
                 trades_count = res['total_trades']
                 win_rate = res['win_rate'] * 100
+                study.tell(trial, ret_pct)
                 
                 print(f"  -> Return: {ret_pct:.2f}% | Trades: {trades_count} | WinRate: {win_rate:.1f}%")
                 
@@ -103,9 +146,6 @@ def run_optimization(days=30, symbol='BTCUSDT'):
                     best_params = params
                     best_result = res
             
-        except Exception as e:
-            print(f"Error: {e}")
-            
     # Summary
     print("\n" + "="*60)
     print("OPTIMIZATION RESULTS")
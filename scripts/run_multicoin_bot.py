@@ -1,12 +1,14 @@
 import time
+import asyncio
 import logging
 from logging.handlers import RotatingFileHandler
 import os
 import sys
-import json
+import orjson
 from dotenv import load_dotenv
 import fcntl
 import errno
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root
 sys.path.append(os.getcwd())
@@ -51,10 +53,124 @@ SYMBOL_MAP = {
     'BCHUSDT': 'BCH/USDT:USDT',
     'OPUSDT': 'OP/USDT:USDT'
 }
+# Reverse map for position symbols: RealTrader reports 'BTC/USDT' (':USDT' stripped), ccxt uses 'BTC/USDT:USDT'
+CCXT_TO_CLEAN = {}
+for _clean, _ccxt in SYMBOL_MAP.items():
+    CCXT_TO_CLEAN[_ccxt] = _clean
+    CCXT_TO_CLEAN[_ccxt.split(':')[0]] = _clean
+
+def clean_symbol(pos_sym):
+    """Position symbol -> clean symbol (e.g. BTCUSDT); dict hit for known coins, string rewrite otherwise"""
+    return CCXT_TO_CLEAN.get(pos_sym) or pos_sym.replace('/', '').replace(':USDT', '').replace(':BUSD', '')
+
+# Status/signal files: numpy values from the strategy serialize natively, int keys become strings as with json
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+COMPACT_JSON_OPTIONS = JSON_OPTIONS & ~orjson.OPT_INDENT_2
+INIT_CONCURRENCY = 4  # Traders initialized at once (each loads markets, syncs time, repairs orders)
+TRADE_WORKERS = 8  # Opportunities processed at once in the main loop
+PARTIAL_CLOSE_WORKERS = 4  # Partial take-profit closes sent at once
+# CZSC reversal markers that signal an exit: top divergence / sell for longs, bottom divergence / buy for shorts
+CZSC_EXIT_MARKERS = {'long': ("顶背驰", "卖"), 'short': ("底背驰", "买")}
+LOOP_INTERVAL_S = 120.0  # Cycle cadence, measured from the start of each cycle
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Exists, owned by another user
+    return True
+
+def acquire_instance_lock(lock_path):
+    """
+    Take the single-instance flock and record our PID; returns the open lock file, or None if a live
+    instance holds it. If the recorded PID is dead (the lock outlived its process, e.g. held by an
+    orphaned child), the lock file is replaced once and the lock retried.
+    """
+    for attempt in range(2):
+        # Append mode: don't truncate the holder's PID before we know we own the lock
+        lock_file = open(lock_path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            lock_file.seek(0)
+            holder = lock_file.read().strip()
+            lock_file.close()
+            if e.errno not in (errno.EAGAIN, errno.EACCES):
+                raise
+            if attempt == 0 and holder.isdigit() and not pid_alive(int(holder)):
+                logger.warning("Lock held for dead PID %s. Taking over stale lock.", holder)
+                os.remove(lock_path)
+                continue
+            return None
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        return lock_file
+    return None
+
+def write_file_atomic(target_file, payload):
+    """Write bytes to a temp file with raw os calls (no file object), fsync, then atomically replace"""
+    temp_file = target_file + ".tmp"
+    fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(temp_file, target_file)
+
+def sleep_until_next_cycle(loop_start):
+    """Sleep out the rest of the cycle so work time doesn't stretch the cadence"""
+    elapsed = time.monotonic() - loop_start
+    if elapsed > LOOP_INTERVAL_S:
+        logger.warning("Cycle took %.1fs, longer than the %.0fs interval. Starting next cycle now.", elapsed, LOOP_INTERVAL_S)
+        return
+    remaining = LOOP_INTERVAL_S - elapsed
+    logger.info("Sleeping for %.0fs...", remaining)
+    time.sleep(remaining)
+
+async def init_traders(proxy_url):
+    """Initialize and start all traders, overlapping their REST handshakes"""
+    sem = asyncio.Semaphore(INIT_CONCURRENCY)
+    total_coins = len(SYMBOL_MAP)
+
+    def init_one(idx, clean_sym, ccxt_sym):
+        logger.info("[%d/%d] Initializing Trader for %s (%s)...", idx, total_coins, clean_sym, ccxt_sym)
+        # Disable trader notifications per user request (Only Hourly Report allowed)
+        trader = RealTrader(symbol=ccxt_sym, notifier=None, proxy_url=proxy_url)
+        if not trader.active:
+            logger.warning("Trader for %s not active.", clean_sym)
+            return None
+        trader.start() # Start to trigger repair_orders and other startup logic
+        logger.info("Trader for %s ready.", clean_sym)
+        return trader
+
+    async def bounded(idx, clean_sym, ccxt_sym):
+        async with sem:
+            try:
+                # RealTrader is sync; run it in a worker thread
+                return await asyncio.to_thread(init_one, idx, clean_sym, ccxt_sym)
+            except Exception as e:
+                logger.error("Failed to init trader for %s: %s", clean_sym, e)
+                return None
+
+    results = await asyncio.gather(*(
+        bounded(idx, clean_sym, ccxt_sym)
+        for idx, (clean_sym, ccxt_sym) in enumerate(SYMBOL_MAP.items(), 1)
+    ))
+    return {clean_sym: trader for clean_sym, trader in zip(SYMBOL_MAP, results) if trader}
 
 def main():
     load_dotenv()
     
+    # The status file is only read by the API; write it compact unless PRETTY_STATUS is set for debugging
+    status_json_options = JSON_OPTIONS if os.getenv("PRETTY_STATUS") else COMPACT_JSON_OPTIONS
+    
     # Proxy Configuration
     # Priority: 1. Environment Variable (if set) 2. Default Local Proxy
     # To disable proxy (e.g. on cloud), set PROXY_URL="" in .env
@@ -64,53 +180,25 @@ def main():
     elif proxy_url == "":
         proxy_url = None # Explicitly disabled via empty string
     
-    logger.info(f"Proxy Configuration: {'Enabled (' + proxy_url + ')' if proxy_url else 'Disabled (Direct Connection)'}")
+    logger.info("Proxy Configuration: %s", f"Enabled ({proxy_url})" if proxy_url else "Disabled (Direct Connection)")
     
     lock_path = "/tmp/btc_quant_multicoin.lock"
     try:
-        lock_file = open(lock_path, "w")
-        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        lock_file.write(str(os.getpid()))
-        lock_file.flush()
+        lock_file = acquire_instance_lock(lock_path)
     except OSError as e:
-        if e.errno in (errno.EAGAIN, errno.EACCES):
-            logger.warning("Another multicoin bot instance is running. Exiting.")
-            return
-        else:
-            logger.error(f"Failed to acquire lock: {e}")
-            return
+        logger.error("Failed to acquire lock: %s", e)
+        return
+    if lock_file is None:
+        logger.warning("Another multicoin bot instance is running. Exiting.")
+        return
     
     # Initialize Feishu
     # feishu = FeishuBot()
     # feishu.send_text("🚀 Multi-Coin Strategy Bot Started (Phase 3 - Top 30 + Optimization)")
     
-    # Initialize Traders (Sequential with delay to avoid API limits)
-    traders = {}
-    
-    logger.info(f"Initializing {len(SYMBOL_MAP)} traders sequentially to avoid API Rate Limits...")
-    
-    total_coins = len(SYMBOL_MAP)
-    current_idx = 0
-    
-    for clean_sym, ccxt_sym in SYMBOL_MAP.items():
-        current_idx += 1
-        logger.info(f"[{current_idx}/{total_coins}] Initializing Trader for {clean_sym} ({ccxt_sym})...")
-        try:
-            # Disable trader notifications per user request (Only Hourly Report allowed)
-            trader = RealTrader(symbol=ccxt_sym, notifier=None, proxy_url=proxy_url)
-            if trader.active:
-                trader.start() # Start to trigger repair_orders and other startup logic
-                traders[clean_sym] = trader
-                logger.info(f"Trader for {clean_sym} ready.")
-            else:
-                logger.warning(f"Trader for {clean_sym} not active.")
-                
-            # Sleep to respect rate limits (e.g. 1s per coin)
-            time.sleep(1)
-            
-        except Exception as e:
-            logger.error(f"Failed to init trader for {clean_sym}: {e}")
-            time.sleep(1) # Sleep even on error
+    # Initialize Traders (concurrently, at most INIT_CONCURRENCY at a time to respect API limits)
+    logger.info("Initializing %d traders (%d at a time)...", len(SYMBOL_MAP), INIT_CONCURRENCY)
+    traders = asyncio.run(init_traders(proxy_url))
             
     if not traders:
         logger.error("No traders initialized. Exiting.")
@@ -131,10 +219,17 @@ def main():
     logger.info("Bot initialized. Entering main loop...")
     
     while True:
+        loop_start = time.monotonic()
         try:
             # Reload Strategy Config
             pm.reload_config()
             
+            # Trailing parameters: read once per cycle (get_config re-reads the file on every call)
+            cfg = pm.config_manager.get_config()
+            # Use configured trailing parameters or defaults
+            trailing_trigger = float(cfg.get('trailing_stop_trigger_pct', 0.01))
+            trailing_lock = float(cfg.get('trailing_stop_lock_pct', 0.02))
+            
             logger.info("--- Scanning Market ---")
             # Get ALL results for frontend display
             all_results = pm.scan_market(return_all=True)
@@ -147,10 +242,12 @@ def main():
             try:
                 # Ensure data directory exists
                 os.makedirs("data", exist_ok=True)
-                with open("data/strategy_signals.json", "w") as f:
-                    json.dump(all_results, f, indent=2)
+                # Serialize before opening so a failure doesn't truncate the last good file
+                data = orjson.dumps(all_results, option=JSON_OPTIONS)
+                with open("data/strategy_signals.json", "wb") as f:
+                    f.write(data)
             except Exception as e:
-                logger.error(f"Failed to save strategy signals: {e}")
+                logger.error("Failed to save strategy signals: %s", e)
 
             
             # --- AGGRESSIVE MODE: Scan Leaderboard (DISABLED for 14-Coin Focus) ---
@@ -187,13 +284,16 @@ def main():
             
             # Log top opportunities
             if opportunities:
-                top_msg = "\n".join([f"{o['symbol']}: {o['signal']} ({o['avg_probability']:.4f})" for o in opportunities])
-                logger.info(f"Signals:\n{top_msg}")
+                # Skip building the summary entirely when INFO is filtered out
+                if logger.isEnabledFor(logging.INFO):
+                    top_msg = "\n".join([f"{o['symbol']}: {o['signal']} ({o['avg_probability']:.4f})" for o in opportunities])
+                    logger.info("Signals:\n%s", top_msg)
             else:
                 logger.info("No signals generated.")
             
             # Get current held positions and account status
             all_active_positions = {}
+            positions_by_clean = {}
             status = {}
             try:
                 if traders:
@@ -206,22 +306,22 @@ def main():
                     # Fetch Full Status (includes positions, balance, pnl, history)
                     status = first_trader.get_status()
                     all_active_positions = status.get('positions', {})
+                    # Clean symbol (e.g. BTCUSDT) -> (position symbol, position), normalized once per cycle
+                    positions_by_clean = {
+                        clean_symbol(pos_sym): (pos_sym, pos_data)
+                        for pos_sym, pos_data in all_active_positions.items()
+                    }
                     
                     # --- PARTIAL TAKE PROFIT LOGIC ---
                     try:
-                        current_total_equity = status.get('equity', 0.0)
-                        if current_total_equity <= 0:
-                             current_total_equity = first_trader.get_total_balance()
-
-                        for pos_sym, pos_data in all_active_positions.items():
-                            clean_sym = pos_sym.replace('/', '').replace(':USDT', '').replace(':BUSD', '')
-                            
-                            if clean_sym not in traders:
-                                continue
-                                
-                            trader = traders[clean_sym]
-                            if not trader.active: continue
-
+                        # Only positions with an active trader can be managed
+                        tradable = [
+                            (clean_sym, pos_data, traders[clean_sym])
+                            for clean_sym, (_, pos_data) in positions_by_clean.items()
+                            if clean_sym in traders and traders[clean_sym].active
+                        ]
+                        to_close = []  # (clean_sym, trader, amount), sent together after the scan
+                        for clean_sym, pos_data, trader in tradable:
                             entry_price = float(pos_data.get('entry_price', 0.0))
                             mark_price = float(pos_data.get('mark_price', 0.0))
                             amount = float(pos_data.get('amount', 0.0))
@@ -234,21 +334,9 @@ def main():
                                     price_change_pct = (entry_price - mark_price) / entry_price
                                 
                                 # Check for CZSC Reversal Signals
-                                market_res = market_analysis_map.get(clean_sym)
-                                czsc_exit_signal = False
-                                czsc_details = ""
-                                
-                                if market_res:
-                                    strat_res = market_res.get('strategy_result', {})
-                                    indicators = strat_res.get('indicators', {})
-                                    czsc_details = indicators.get('czsc_details', "")
-                                    
-                                    if side == 'long':
-                                        if "顶背驰" in czsc_details or "卖" in czsc_details:
-                                            czsc_exit_signal = True
-                                    elif side == 'short':
-                                        if "底背驰" in czsc_details or "买" in czsc_details:
-                                            czsc_exit_signal = True
+                                market_res = market_analysis_map.get(clean_sym) or {}
+                                czsc_details = market_res.get('strategy_result', {}).get('indicators', {}).get('czsc_details', "")
+                                czsc_exit_signal = any(marker in czsc_details for marker in CZSC_EXIT_MARKERS.get(side, ()))
                                 
                                 # Threshold Logic
                                 should_close = False
@@ -269,60 +357,93 @@ def main():
                                     # We remove the size_threshold check to ensure we secure profits on ALL winning trades
                                     # as per strategy "Partial TP (50% at 3% profit)".
                                     
-                                    logger.info(f"💰 [Partial TP] {clean_sym} {close_reason}. Closing 50% to secure profit...")
+                                    logger.info("💰 [Partial TP] %s %s. Closing 50%% to secure profit...", clean_sym, close_reason)
                                     
                                     close_amount = amount * 0.5
                                     close_amount = float(trader.exchange.amount_to_precision(trader.symbol, close_amount))
                                     
                                     if close_amount > 0:
-                                        trader.close_partial(close_amount)
+                                        to_close.append((clean_sym, trader, close_amount))
+                        
+                        # Each close is a reduce-only market order on its own trader: send them concurrently
+                        if to_close:
+                            with ThreadPoolExecutor(max_workers=PARTIAL_CLOSE_WORKERS) as executor:
+                                futures = {
+                                    executor.submit(trader.close_partial, close_amount): clean_sym
+                                    for clean_sym, trader, close_amount in to_close
+                                }
+                                for future, clean_sym in futures.items():
+                                    try:
+                                        future.result()
+                                    except Exception as e:
+                                        logger.error("[Partial TP] Failed to close %s: %s", clean_sym, e)
 
                     except Exception as e:
-                        logger.error(f"Error in Partial TP Logic: {e}")
+                        logger.error("Error in Partial TP Logic: %s", e)
                     # ---------------------------------
                     
                     # Save status to file for API/Frontend
                     try:
                         os.makedirs("data", exist_ok=True)
-                        temp_file = "data/real_trading_status.json.tmp"
-                        target_file = "data/real_trading_status.json"
                         
-                        with open(temp_file, "w") as f:
-                            # Add timestamp
-                            status['updated_at'] = time.time()
-                            json.dump(status, f, indent=2, default=str)
-                            f.flush()
-                            os.fsync(f.fileno())
+                        # Add timestamp
+                        status['updated_at'] = time.time()
+                        data = orjson.dumps(status, default=str, option=status_json_options)
+                        write_file_atomic("data/real_trading_status.json", data)
                         
-                        # Atomic replace
-                        os.replace(temp_file, target_file)
-                        
-                        logger.info(f"Saved real trading status with {len(all_active_positions)} positions")
+                        logger.info("Saved real trading status with %d positions", len(all_active_positions))
                     except Exception as e:
-                        logger.error(f"Failed to save real trading status: {e}")
+                        logger.error("Failed to save real trading status: %s", e)
                         
             except Exception as e:
-                logger.error(f"Failed to fetch active positions/status: {e}")
+                logger.error("Failed to fetch active positions/status: %s", e)
 
+            # Equity for sizing: taken once per cycle from the status snapshot, shared by every opportunity
+            total_equity = float(status.get('equity') or 0.0)
+            if opportunities and total_equity <= 0:
+                try:
+                    # Retry logic for equity
+                    first_trader = next(iter(traders.values()))
+                    for _ in range(3):
+                        total_equity = first_trader.get_total_balance()
+                        if total_equity > 0:
+                            break
+                        time.sleep(1)
+                except Exception as e:
+                    logger.error("Failed to fetch equity: %s", e)
+                
+                if total_equity <= 0:
+                    logger.warning("Could not fetch equity. Using fallback 100.0 USDT for calculation (Safe Mode).")
+                    total_equity = 100.0 # Fallback
+            
             # Execute Trades
-            for opp in opportunities:
+            # Each opportunity has its own trader, and its REST calls (balance, leverage, orders)
+            # are I/O-bound: process them on a thread pool instead of one after another
+            def process_opp(opp):
                 symbol = opp['symbol'] # Clean symbol e.g. BTCUSDT
                 signal_str = opp['signal']
                 
                 # Extract Strategy Result
                 strat_res = opp.get('strategy_result', {})
                 trade_params = strat_res.get('trade_params', {})
+                indicators = strat_res.get('indicators', {})
                 
-                logger.info(f"Processing signal for {symbol}: {signal_str} | Params: {trade_params}")
+                logger.info("Processing signal for %s: %s | Params: %s", symbol, signal_str, trade_params)
                 
                 if symbol not in traders:
-                    continue
+                    return
+                
+                # Price drives trailing management, sizing and the coin amount; bind it once
+                price = float(opp.get('price') or 0.0)
+                if price <= 0:
+                    logger.error("[%s] Invalid price %s. Skipping trade.", symbol, price)
+                    return
                     
                 trader = traders[symbol]
                 
                 if not trader.active:
-                    logger.warning(f"Trader for {symbol} is not active. Skipping.")
-                    continue
+                    logger.warning("Trader for %s is not active. Skipping.", symbol)
+                    return
                 
                 # Convert signal string to int
                 trade_signal = 0
@@ -334,80 +455,43 @@ def main():
                 # Check Correlation Risk (Only for New Positions)
                 # If we are opening a NEW position, check if it correlates with existing positions of SAME direction.
                 # Logic: If Longing BTC, check correlation with other Longs.
-                is_new_position = True
-                for pos_sym in all_active_positions:
-                     clean = pos_sym.replace('/', '').replace(':USDT', '').replace(':BUSD', '')
-                     if clean == symbol:
-                         is_new_position = False
-                         break
+                is_new_position = symbol not in positions_by_clean
                 
                 # --- Trailing Stop & Position Management for Existing Positions ---
                 if not is_new_position:
                     try:
-                        current_price = opp.get('price')
-                        if current_price:
-                            cfg = pm.config_manager.get_config()
-                            # Use configured trailing parameters or defaults
-                            trailing_trigger = float(cfg.get('trailing_stop_trigger_pct', 0.01))
-                            trailing_lock = float(cfg.get('trailing_stop_lock_pct', 0.02))
-                            
-                            logger.info(f"🛡️ Managing position for {symbol}: Price={current_price}, Signal={trade_signal}")
-                            trader.manage_position(
-                                current_price=float(current_price), 
-                                signal=trade_signal, 
-                                symbol=symbol,
-                                trailing_trigger_pct=trailing_trigger,
-                                trailing_lock_pct=trailing_lock
-                            )
+                        logger.info("🛡️ Managing position for %s: Price=%s, Signal=%s", symbol, price, trade_signal)
+                        trader.manage_position(
+                            current_price=price, 
+                            signal=trade_signal, 
+                            symbol=symbol,
+                            trailing_trigger_pct=trailing_trigger,
+                            trailing_lock_pct=trailing_lock
+                        )
                     except Exception as e:
-                        logger.error(f"Failed to manage position for {symbol}: {e}")
+                        logger.error("Failed to manage position for %s: %s", symbol, e)
                 # ----------------------------------------------------------------
 
                 if is_new_position and trade_signal != 0:
-                    same_side_clean = []
-                    for pos_sym, pos_data in all_active_positions.items():
-                        # Normalize
-                        clean = pos_sym.replace('/', '').replace(':USDT', '').replace(':BUSD', '')
-                        
-                        # Check direction
-                        pos_side = pos_data['side'] # 'long' or 'short'
-                        if (pos_side == 'long' and trade_signal == 1) or \
-                           (pos_side == 'short' and trade_signal == -1):
-                            same_side_clean.append(clean)
+                    # Check direction ('long' or 'short')
+                    wanted_side = 'long' if trade_signal == 1 else 'short'
+                    same_side_clean = [
+                        clean for clean, (_, pos_data) in positions_by_clean.items()
+                        if pos_data['side'] == wanted_side
+                    ]
                     
                     # Tighten correlation threshold from 0.70 -> 0.65
                     if not pm.correlation_manager.check_portfolio_correlation(symbol, same_side_clean, threshold=0.65):
-                        logger.warning(f"🚫 [Correlation Risk] Skipping {symbol} ({signal_str}) due to high correlation with {same_side_clean}")
-                        continue
+                        logger.warning("🚫 [Correlation Risk] Skipping %s (%s) due to high correlation with %s", symbol, signal_str, same_side_clean)
+                        return
 
                 # Check Position Limits
                 # 1) Max Total Position Limit (User Rule: Max 10x Equity)
                 # 2) Per-coin Limit (3x Equity)
                 # 3) Same-side Net Exposure Limit (6x Equity)
-                # NOTE: Use 'position_value_usdt' if present, fallback to 'notional'
-                current_total_notional = 0.0
-                for pos_sym, pos_data in all_active_positions.items():
-                    current_total_notional += float(pos_data.get('position_value_usdt', pos_data.get('notional', 0.0)))
-                
                 # Estimate new position size
                 # We need to know the planned position size. 
                 
-                # Fetch equity for calculations
-                total_equity = 0.0
-                try:
-                    # Retry logic for equity
-                    for _ in range(3):
-                        total_equity = trader.get_total_balance()
-                        if total_equity > 0:
-                            break
-                        time.sleep(1)
-                except Exception as e:
-                    logger.error(f"Failed to fetch equity: {e}")
-                
-                if total_equity <= 0:
-                    logger.warning("Could not fetch equity. Using fallback 100.0 USDT for calculation (Safe Mode).")
-                    total_equity = 100.0 # Fallback
-
                 # Calculate planned size
                 # Strategy: Use PortfolioManager Safe Calculation
                 
@@ -422,10 +506,8 @@ def main():
                     effective_confidence = 1.0 - ml_prob
                 
                 # Extract Market Data for Kelly Sizing
-                indicators = strat_res.get('indicators', {})
                 atr_val = float(indicators.get('atr', 0.0))
                 market_mode = trade_params.get('market_mode', 'normal')
-                current_price = float(opp.get('price', 0.0))
                 
                 # Check Global Leverage Limits First
                 is_allowed, reason = pm.check_leverage_limits(
@@ -435,8 +517,8 @@ def main():
                 )
                 
                 if not is_allowed:
-                    logger.warning(f"🚫 [Risk Limit] Skipping {symbol}: {reason}")
-                    continue
+                    logger.warning("🚫 [Risk Limit] Skipping %s: %s", symbol, reason)
+                    return
 
                 # Calculate Safe Position Size (Notional USDT)
                 allowed_notional = pm.calculate_position_size(
@@ -444,13 +526,13 @@ def main():
                     current_positions=all_active_positions,
                     confidence=effective_confidence,
                     atr=atr_val,
-                    price=current_price,
+                    price=price,
                     market_mode=market_mode
                 )
                 
                 if allowed_notional < 20.0: 
-                    logger.warning(f"🚫 [Size Limit] Skipping {symbol}: Allowed size {allowed_notional:.2f} < Min 20.0")
-                    continue
+                    logger.warning("🚫 [Size Limit] Skipping %s: Allowed size %.2f < Min 20.0", symbol, allowed_notional)
+                    return
                 
                 # Determine Target Leverage
                 # Default 5x, High Conf 8x
@@ -464,15 +546,9 @@ def main():
                 # We'll use the allowed_notional directly to maximize utilization up to the limit.
                 planned_notional = allowed_notional
                 
-                # Safety check for price
-                exec_price = float(opp.get('price', 0.0))
-                if exec_price <= 0:
-                    logger.error(f"[{symbol}] Invalid price {exec_price}. Skipping trade.")
-                    continue
-                    
-                amount_coins = planned_notional / exec_price
+                amount_coins = planned_notional / price
                 
-                logger.info(f"[{symbol}] Position Sizing: Equity=${total_equity:.2f}, Planned=${planned_notional:.2f} (MaxAllowed), Leverage={final_leverage}x")
+                logger.info("[%s] Position Sizing: Equity=$%.2f, Planned=$%.2f (MaxAllowed), Leverage=%sx", symbol, total_equity, planned_notional, final_leverage)
                 
                 # Execute Trade
                 if trade_signal != 0:
@@ -504,16 +580,24 @@ def main():
                         grid_spacing_pct=trade_params.get('grid_spacing_pct'),
                         grid_wait_s=trade_params.get('grid_wait_s'),
                     )
+
+            if opportunities:
+                with ThreadPoolExecutor(max_workers=TRADE_WORKERS) as executor:
+                    futures = {executor.submit(process_opp, opp): opp for opp in opportunities}
+                    for future, opp in futures.items():
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error("Failed to process signal for %s: %s", opp['symbol'], e)
             
-            logger.info("Sleeping for 120s...")
-            time.sleep(120) 
+            sleep_until_next_cycle(loop_start)
             
         except KeyboardInterrupt:
             logger.info("Bot stopped by user.")
             break
         except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            time.sleep(120)
+            logger.error("Error in main loop: %s", e)
+            sleep_until_next_cycle(loop_start)
 
 if __name__ == "__main__":
     main()
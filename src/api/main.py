@@ -1225,10 +1225,15 @@ async def get_data_summary():
                 if df.empty:
                     return None
                     
+                # Newer files only carry ms timestamps
+                if 'datetime' in df.columns:
+                    start, end = df.iloc[0]['datetime'], df.iloc[-1]['datetime']
+                else:
+                    start, end = pd.to_datetime(df['timestamp'].iloc[[0, -1]], unit='ms')
                 return {
                     "rows": len(df),
-                    "start": str(df.iloc[0]['datetime']),
-                    "end": str(df.iloc[-1]['datetime']),
+                    "start": str(start),
+                    "end": str(end),
                     "size": os.path.getsize(path)
                 }
             except:
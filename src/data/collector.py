@@ -11,6 +11,21 @@ from datetime import datetime, timedelta
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+HISTORY_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume'
+]
+
+TIMEFRAME_MS = {
+    '1m': 60000,
+    '5m': 300000,
+    '15m': 900000,
+    '30m': 1800000,
+    '1h': 3600000,
+    '4h': 14400000,
+    '1d': 86400000
+}
+
 class CryptoDataCollector:
     def __init__(self, symbol='BTCUSDT', proxies=None):
         self.symbol = symbol.replace('/', '') # Ensure format is BTCUSDT
@@ -231,16 +246,7 @@ class CryptoDataCollector:
         end_time = int(time.time() * 1000)
         
         # Determine interval in ms
-        interval_map = {
-            '1m': 60000,
-            '5m': 300000,
-            '15m': 900000,
-            '30m': 1800000,
-            '1h': 3600000,
-            '4h': 14400000,
-            '1d': 86400000
-        }
-        interval_ms = interval_map.get(timeframe, 3600000)
+        interval_ms = TIMEFRAME_MS.get(timeframe, 3600000)
         
         timestamps = [end_time - (i * interval_ms) for i in range(limit)]
         timestamps.reverse()
@@ -271,10 +277,14 @@ class CryptoDataCollector:
         start_ts, end_ts: timestamps in milliseconds
         """
         logger.info(f"Fetching data from {datetime.fromtimestamp(start_ts/1000)} to {datetime.fromtimestamp(end_ts/1000)}")
-        all_ohlcv = []
         limit = 1000
         since = start_ts
         
+        # Typed buffer sized for the whole range (+5% slack), filled page by page
+        expected = int((end_ts - start_ts) / TIMEFRAME_MS.get(timeframe, 60000) * 1.05) + limit
+        buf = np.empty((expected, len(HISTORY_COLUMNS)), dtype=np.float64)
+        n = 0
+        
         while since < end_ts:
             try:
                 # Ensure we don't go beyond end_ts
@@ -289,18 +299,24 @@ class CryptoDataCollector:
                 # but fetch_ohlcv returns 1000 candles starting from 'since'.
                 # So just check the last timestamp.
                 
-                raw_batch = df_batch[['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume']].values.tolist()
+                raw_batch = df_batch[HISTORY_COLUMNS].to_numpy(dtype=np.float64)
                 
                 # Filter duplicate/overlap if any (though 'since' logic should prevent it)
-                if all_ohlcv and raw_batch[0][0] <= all_ohlcv[-1][0]:
+                if n and raw_batch[0, 0] <= buf[n - 1, 0]:
                      # Skip overlap
-                     raw_batch = [r for r in raw_batch if r[0] > all_ohlcv[-1][0]]
+                     raw_batch = raw_batch[raw_batch[:, 0] > buf[n - 1, 0]]
                 
-                if not raw_batch:
+                if not len(raw_batch):
                     break
-                    
-                all_ohlcv.extend(raw_batch)
-                last_time = raw_batch[-1][0]
+                
+                # Grow (doubling) if the range estimate was short
+                if n + len(raw_batch) > len(buf):
+                    grown = np.empty((2 * len(buf) + len(raw_batch), len(HISTORY_COLUMNS)), dtype=np.float64)
+                    grown[:n] = buf[:n]
+                    buf = grown
+                buf[n:n + len(raw_batch)] = raw_batch
+                n += len(raw_batch)
+                last_time = raw_batch[-1, 0]
                 
                 # Update 'since'
                 since = int(last_time) + 1
@@ -316,10 +332,12 @@ class CryptoDataCollector:
                 logger.error(f"Error fetching batch: {e}")
                 time.sleep(2)
         
-        if not all_ohlcv:
+        if not n:
             return pd.DataFrame()
             
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        arr = buf[:n]
+        df = pd.DataFrame({col: arr[:, i] for i, col in enumerate(HISTORY_COLUMNS)})
+        df['timestamp'] = df['timestamp'].astype('int64')
         df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
         
         # Final filter to ensure range
@@ -346,23 +364,15 @@ class CryptoDataCollector:
                 if df_batch.empty:
                     break
                 
-                ohlcv = df_batch.values.tolist()
-                # Need to convert back to raw list for extending or just use df
-                # But to keep logic similar, let's just append to a list of dicts or rows
-                
-                # Simpler: just concat DFs
-                # But let's stick to list for loop loop
+                # Keep each page as one typed 2-D array; df_batch has 'datetime' col which we don't need
+                raw_batch = df_batch[HISTORY_COLUMNS].to_numpy(dtype=np.float64)
                 
-                # We need to extract the raw rows: [timestamp, open, high, low, close, volume]
-                # df_batch has 'datetime' col which we don't need in raw list
-                raw_batch = df_batch[['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume']].values.tolist()
-                
-                all_ohlcv.extend(raw_batch)
-                last_time = raw_batch[-1][0]
+                all_ohlcv.append(raw_batch)
+                last_time = int(raw_batch[-1, 0])
                 logger.info(f"Fetched {len(raw_batch)} candles, last candle: {datetime.fromtimestamp(last_time/1000)}")
                 
                 # Update 'since'
-                since = int(last_time) + 1
+                since = last_time + 1
                 
                 if len(raw_batch) < limit:
                     break
@@ -380,7 +390,10 @@ class CryptoDataCollector:
         if not all_ohlcv:
             return pd.DataFrame()
             
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'taker_buy_volume', 'taker_buy_quote_volume'])
+        # One concatenate, then columns attached by slice (no per-cell object boxing)
+        arr = np.concatenate(all_ohlcv)
+        df = pd.DataFrame({col: arr[:, i] for i, col in enumerate(HISTORY_COLUMNS)})
+        df['timestamp'] = df['timestamp'].astype('int64')
         df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
         df = df.drop_duplicates(subset=['timestamp']).sort_values('timestamp').reset_index(drop=True)
         
@@ -1,5 +1,5 @@
 import requests
-import json
+import orjson
 import logging
 import datetime
 import os
@@ -34,8 +34,8 @@ class FeishuBot:
         """Load history and stats from file"""
         if os.path.exists(self.persistence_file):
             try:
-                with open(self.persistence_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.persistence_file, 'rb') as f:
+                    data = orjson.loads(f.read())
                     self.message_history = data.get("history", [])
                     saved_stats = data.get("stats", {})
                     # Merge saved stats with defaults to ensure all keys exist
@@ -50,8 +50,8 @@ class FeishuBot:
                 "history": self.message_history,
                 "stats": self.stats
             }
-            with open(self.persistence_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(self.persistence_file, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         except Exception as e:
             logger.error(f"Failed to save Feishu data: {e}")
 
@@ -161,11 +161,14 @@ class FeishuBot:
             'User-Agent': 'curl/7.64.1' # Mimic curl to avoid potential blocking
         }
         
+        # Serialize once; retries resend the same bytes
+        payload = orjson.dumps(data)
+        
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                logger.info(f"Sending to Feishu (Attempt {attempt+1}/{max_retries}): {self.webhook_url[:10]}... Payload: {json.dumps(data)}")
-                response = self.session.post(self.webhook_url, headers=headers, data=json.dumps(data), timeout=15)
+                logger.info(f"Sending to Feishu (Attempt {attempt+1}/{max_retries}): {self.webhook_url[:10]}... Payload: {payload.decode()}")
+                response = self.session.post(self.webhook_url, headers=headers, data=payload, timeout=15)
                 logger.info(f"Feishu Response: {response.status_code} - {response.text}")
                 response.raise_for_status()
                 self._log_message(msg_type, log_content, True)
@@ -151,7 +151,8 @@ class DailyUpdateManager:
             new_df = new_df[df.columns]
             updated_df = pd.concat([df, new_df], ignore_index=True)
         else:
-            updated_df = new_df
+            # datetime is derived from timestamp on load, not stored
+            updated_df = new_df.drop(columns='datetime', errors='ignore')
             
         # Deduplicate just in case
         updated_df = updated_df.drop_duplicates(subset=['timestamp'])
@@ -5,9 +5,11 @@ import json
 import time
 from datetime import datetime
 from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
 
 from src.notification.feishu import FeishuBot
 from src.utils.history_recorder import EquityRecorder
+from src.utils.markets_cache import load_markets_cached_sync
 from src.utils.config_manager import config_manager
 
 logger = logging.getLogger(__name__)
@@ -96,14 +98,22 @@ class RealTrader:
                 logger.info(f"Using proxy: {self.proxy_url}")
                 
             self.exchange = ccxt.binanceusdm(options)
+            # Keep-alive pool so consecutive REST calls reuse TLS connections
+            self.exchange.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
             logger.info("ccxt instance created")
             # Sync time difference to avoid timestamp errors
+            time_synced = False
             try:
                 self._sync_time_offset()
+                time_synced = True
             except Exception as e:
                 logger.warning(f"Failed to sync time offset: {e}")
-            # Load markets to check connectivity
-            self.exchange.load_markets()
+            # Load markets to check connectivity; once fetch_time has proven the link,
+            # take them from the shared disk cache when fresh (exchangeInfo is ~1-2MB)
+            if time_synced:
+                load_markets_cached_sync(self.exchange)
+            else:
+                self.exchange.load_markets()
             logger.info("Connected to Binance Futures Real Trading")
             
             # Set leverage with fallback logic
@@ -142,6 +152,7 @@ class RealTrader:
         self.position_entry_times = {} # Track entry time for active positions from history analysis
         self.open_orders_count = 0 # Track open orders count
         self.last_equity = 0.0
+        self.last_fetched_equity = None  # Equity from the latest get_balance() call, None if it failed
         
         # Cache for open orders to avoid rate limits
         self.cached_open_orders = []
@@ -196,6 +207,17 @@ class RealTrader:
                     raise
         raise last_exc
 
+    def _fetch_per_symbol(self, method: str, symbols: list, *args, **kwargs):
+        """Run one exchange call per symbol; returns {symbol: result}, skipping failures."""
+        # Sequential on purpose: the sync ccxt throttle and last_* response fields aren't thread-safe
+        results = {}
+        for sym in symbols:
+            try:
+                results[sym] = self._safe_exchange_call(method, sym, *args, **kwargs)
+            except Exception:
+                pass
+        return results
+
     def record_equity(self):
         """Record current equity state to history file."""
         if not self.exchange: return
@@ -248,6 +270,7 @@ class RealTrader:
                 self.initial_balance = total_balance
             if total_balance > 0:
                 self.last_equity = total_balance
+            self.last_fetched_equity = float(total_balance)
             
             self.last_connection_status = "Connected"
             self.last_connection_error = None
@@ -323,12 +346,8 @@ class RealTrader:
                         # Fetch per symbol
                         unique_symbols = list(set(self.monitored_symbols))
                         temp_orders = []
-                        for sym in unique_symbols:
-                            try:
-                                orders = self._safe_exchange_call('fetch_open_orders', sym)
-                                temp_orders.extend(orders)
-                            except Exception:
-                                pass
+                        for orders in self._fetch_per_symbol('fetch_open_orders', unique_symbols).values():
+                            temp_orders.extend(orders)
                         open_orders = temp_orders
                         self.cached_open_orders = open_orders
                         self.last_open_orders_fetch = now
@@ -1323,16 +1342,11 @@ class RealTrader:
             target_symbols = symbols if symbols else self.monitored_symbols
             
             if target_symbols:
-                # Multi-symbol fetch
-                for sym in target_symbols:
-                    try:
-                        # Limit per coin to avoid fetching too much data
-                        limit_per_coin = 500 if len(target_symbols) > 5 else limit
-                        t = self.exchange.fetch_my_trades(sym, limit=limit_per_coin) 
-                        trades.extend(t)
-                    except Exception as e:
-                        # logger.warning(f"Failed to fetch trades for {sym}: {e}")
-                        pass
+                # Multi-symbol fetch (failed symbols are skipped)
+                # Limit per coin to avoid fetching too much data
+                limit_per_coin = 500 if len(target_symbols) > 5 else limit
+                for t in self._fetch_per_symbol('fetch_my_trades', list(target_symbols), limit=limit_per_coin).values():
+                    trades.extend(t)
             else:
                 # Fallback
                 trades = self.exchange.fetch_my_trades(self.symbol, limit=limit)
@@ -1553,51 +1567,48 @@ class RealTrader:
                 amount = float(pos['amount'])
                 side = pos['side']
                 
+                # Close side is the same for SL and TP
+                close_side = 'sell' if side == 'long' else 'buy'
+                
+                # Collect the missing legs, then place them
+                orders = []
+                
                 # Repair SL
                 if sl_price <= 0:
                     logger.warning(f"[{symbol}] Missing SL! Placing default SL ({sl_pct*100}%)...")
-                    
-                    new_sl = 0.0
-                    sl_side = ''
-                    
-                    if side == 'long':
-                        new_sl = entry_price * (1 - sl_pct)
-                        sl_side = 'sell'
-                    else:
-                        new_sl = entry_price * (1 + sl_pct)
-                        sl_side = 'buy'
-                        
-                    try:
-                        self._safe_exchange_call('create_order', symbol, 'STOP_MARKET', sl_side, amount, params={
+                    new_sl = entry_price * (1 - sl_pct) if side == 'long' else entry_price * (1 + sl_pct)
+                    orders.append({
+                        'symbol': symbol, 'type': 'STOP_MARKET', 'side': close_side, 'amount': amount,
+                        'params': {
                             'stopPrice': self.exchange.price_to_precision(symbol, new_sl),
                             'reduceOnly': True
-                        })
-                        logger.info(f"[{symbol}] Repaired SL at {new_sl}")
-                    except Exception as e:
-                        logger.error(f"[{symbol}] Failed to repair SL: {e}")
+                        }
+                    })
                 
                 # Repair TP
                 if tp_price <= 0:
                     logger.warning(f"[{symbol}] Missing TP! Placing default TP ({tp_pct*100}%)...")
-                    
-                    new_tp = 0.0
-                    tp_side = ''
-                    
-                    if side == 'long':
-                        new_tp = entry_price * (1 + tp_pct)
-                        tp_side = 'sell'
-                    else:
-                        new_tp = entry_price * (1 - tp_pct)
-                        tp_side = 'buy'
-                        
-                    try:
-                        self._safe_exchange_call('create_order', symbol, 'TAKE_PROFIT_MARKET', tp_side, amount, params={
+                    new_tp = entry_price * (1 + tp_pct) if side == 'long' else entry_price * (1 - tp_pct)
+                    orders.append({
+                        'symbol': symbol, 'type': 'TAKE_PROFIT_MARKET', 'side': close_side, 'amount': amount,
+                        'params': {
                             'stopPrice': self.exchange.price_to_precision(symbol, new_tp),
                             'reduceOnly': True
-                        })
-                        logger.info(f"[{symbol}] Repaired TP at {new_tp}")
+                        }
+                    })
+                
+                if not orders:
+                    continue
+                
+                # Conditional orders route to the algo order endpoint, which batchOrders can't reach;
+                # place each leg with its own create_order
+                for order in orders:
+                    label = 'SL' if order['type'] == 'STOP_MARKET' else 'TP'
+                    try:
+                        self._safe_exchange_call('create_order', order['symbol'], order['type'], order['side'], order['amount'], params=order['params'])
+                        logger.info(f"[{symbol}] Repaired {label} at {order['params']['stopPrice']}")
                     except Exception as e:
-                        logger.error(f"[{symbol}] Failed to repair TP: {e}")
+                        logger.error(f"[{symbol}] Failed to repair {label}: {e}")
 
         except Exception as e:
             logger.error(f"Error in repair_orders: {e}")
@@ -1771,10 +1782,14 @@ class RealTrader:
             # Call get_recent_trades FIRST to populate position_entry_times for active positions
             trade_history = self.get_recent_trades(limit=1000)
             
+            self.last_fetched_equity = None
             balance = self.get_balance() # This is free balance
             
-            # Get Equity (totalMarginBalance)
-            equity = self.get_total_balance()
+            # Get Equity (totalMarginBalance): get_balance already read it from the same fetch_balance
+            # response; only fetch again if that call failed
+            equity = self.last_fetched_equity
+            if equity is None:
+                equity = self.get_total_balance()
             
             # Use get_positions to return ALL active positions
             positions_dict = self.get_positions()
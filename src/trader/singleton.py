@@ -0,0 +1,34 @@
+import logging
+import threading
+
+from src.trader.real_trader import RealTrader
+
+logger = logging.getLogger(__name__)
+
+_traders = {}
+_lock = threading.Lock()
+
+
+def get_trader(api_key: str = None, api_secret: str = None, proxy_url: str = None, symbol: str = "BTC/USDT:USDT", leverage: int = 1) -> RealTrader:
+    """
+    Return a process-wide RealTrader for these credentials.
+    Repeated calls reuse the already connected exchange (markets loaded,
+    time synced, pooled HTTP session) instead of re-initializing it.
+    Only active traders are cached, so a failed init is retried on the next call.
+    """
+    key = (api_key, api_secret, proxy_url, symbol, leverage)
+    with _lock:
+        trader = _traders.get(key)
+        if trader is not None:
+            return trader
+        logger.info(f"Creating shared RealTrader for {symbol}")
+        trader = RealTrader(
+            symbol=symbol,
+            leverage=leverage,
+            api_key=api_key,
+            api_secret=api_secret,
+            proxy_url=proxy_url
+        )
+        if trader.active:
+            _traders[key] = trader
+        return trader
@@ -0,0 +1,38 @@
+import os
+import logging
+from functools import lru_cache
+
+import orjson
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def load_env():
+    """Parse .env into os.environ once per process and return a snapshot."""
+    load_dotenv()
+    return os.environ.copy()
+
+
+@lru_cache(maxsize=8)
+def _read_json(path, mtime):
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def load_json_config(path):
+    """
+    Load a JSON config file, re-reading it only when its mtime changes.
+    Returns an empty dict if the file is missing or unreadable.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    try:
+        # Hand out a copy so callers can't mutate the cached dict
+        return dict(_read_json(path, mtime))
+    except Exception as e:
+        logger.error(f"Failed to load config {path}: {e}")
+        return {}
@@ -0,0 +1,62 @@
+import os
+import logging
+
+import ccxt.async_support as ccxt_async
+
+from src.utils.env import load_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROXY_URL = "http://127.0.0.1:33210"
+
+# 14 Target Symbols (CCXT Futures format)
+# Note: PEPE is 1000PEPE on Binance Futures
+FUTURES_SYMBOLS = [
+    'BTC/USDT:USDT', 'ETH/USDT:USDT', 'SOL/USDT:USDT', 'BNB/USDT:USDT', 'DOGE/USDT:USDT',
+    'XRP/USDT:USDT', '1000PEPE/USDT:USDT', 'AVAX/USDT:USDT', 'LINK/USDT:USDT', 'ADA/USDT:USDT',
+    'TRX/USDT:USDT', 'LDO/USDT:USDT', 'BCH/USDT:USDT', 'OP/USDT:USDT'
+]
+
+
+def resolve_proxy_url():
+    """PROXY_URL from env; unset falls back to the local dev proxy, empty disables it."""
+    proxy_url = os.getenv("PROXY_URL")
+    if proxy_url is None:
+        return DEFAULT_PROXY_URL
+    return proxy_url or None
+
+
+def create_async_futures_exchange():
+    """
+    Build an async Binance USDT-M client from .env credentials.
+    Returns None when credentials are missing.
+    """
+    load_env()
+    api_key = os.getenv("BINANCE_API_KEY")
+    secret = os.getenv("BINANCE_SECRET")
+
+    if not api_key or not secret:
+        logger.error("API credentials missing in .env")
+        return None
+
+    options = {
+        'apiKey': api_key,
+        'secret': secret,
+        'options': {
+            'defaultType': 'swap',
+            'fetchCurrencies': False,  # Disable fetching currencies to avoid hitting sapi
+            'warnOnFetchOpenOrdersWithoutSymbol': False
+        },
+        'has': {
+            'fetchCurrencies': False
+        },
+        'enableRateLimit': True,
+        'timeout': 30000,
+    }
+
+    proxy_url = resolve_proxy_url()
+    if proxy_url:
+        options['aiohttp_proxy'] = proxy_url
+        logger.info(f"Using proxy: {proxy_url}")
+
+    return ccxt_async.binanceusdm(options)
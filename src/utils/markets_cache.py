@@ -0,0 +1,64 @@
+import os
+import time
+import tempfile
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'binance_usdm_markets.json')
+DEFAULT_TTL = 3600  # seconds
+
+
+def read_markets_cache(path: str = DEFAULT_CACHE_PATH, ttl: int = DEFAULT_TTL):
+    """Return cached exchange markets if the cache file is younger than ttl, else None."""
+    try:
+        if time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except OSError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable markets cache {path}: {e}")
+        return None
+
+
+def write_markets_cache(markets: dict, path: str = DEFAULT_CACHE_PATH):
+    """Persist exchange.markets atomically so concurrent writers and readers never see a partial file."""
+    tmp_path = None
+    try:
+        cache_dir = os.path.dirname(path) or '.'
+        os.makedirs(cache_dir, exist_ok=True)
+        # Unique temp name per writer: concurrent writers (threads or processes) never share a file
+        with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=os.path.basename(path) + '.', suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            f.write(orjson.dumps(markets))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write markets cache {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def load_markets_cached(exchange, path: str = DEFAULT_CACHE_PATH, ttl: int = DEFAULT_TTL):
+    """Populate an async ccxt exchange's markets from the disk cache, downloading only when stale."""
+    markets = read_markets_cache(path, ttl)
+    if markets:
+        exchange.set_markets(markets)
+    else:
+        await exchange.load_markets()
+        write_markets_cache(exchange.markets, path)
+    return exchange.markets
+
+
+def load_markets_cached_sync(exchange, path: str = DEFAULT_CACHE_PATH, ttl: int = DEFAULT_TTL):
+    """Blocking counterpart of load_markets_cached for sync ccxt exchanges."""
+    markets = read_markets_cache(path, ttl)
+    if markets:
+        exchange.set_markets(markets)
+    else:
+        exchange.load_markets()
+        write_markets_cache(exchange.markets, path)
+    return exchange.markets
@@ -0,0 +1,86 @@
+import os
+import csv
+
+import numpy as np
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+# New files store only ms timestamps; readers derive datetime with pd.to_datetime(df['timestamp'], unit='ms')
+CSV_COLUMNS = OHLCV_COLUMNS
+# Still filled in when appending to older files that carry a datetime column
+LEGACY_COLUMNS = OHLCV_COLUMNS + ['datetime']
+TAIL_BYTES = 4096
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def read_last_timestamp(filepath):
+    """
+    Return the timestamp of the last row of an OHLCV CSV without loading the file.
+    Returns None if the file is missing, has no data rows, or has no timestamp column.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.readline().decode().strip().split(',')
+            if 'timestamp' not in header:
+                return None
+            col = header.index('timestamp')
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - TAIL_BYTES))
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    for line in reversed(lines):
+        fields = line.decode().split(',')
+        if len(fields) != len(header):
+            continue
+        try:
+            return int(float(fields[col]))
+        except ValueError:
+            continue
+    return None
+
+
+class OhlcvCsvWriter:
+    """Stream ccxt OHLCV batches to a CSV so only one batch is held in memory."""
+
+    def __init__(self, filepath, append=False):
+        header = None
+        if append and os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+            with open(filepath, newline='') as f:
+                header = next(csv.reader(f), None)
+        # Appends follow the existing file's column order
+        self.columns = header or CSV_COLUMNS
+        # Position of each output column in [*candle, datetime, ''] (unknown columns stay empty)
+        self._order = [LEGACY_COLUMNS.index(c) if c in LEGACY_COLUMNS else len(LEGACY_COLUMNS) for c in self.columns]
+        self._with_datetime = 'datetime' in self.columns
+        self.rows = 0
+        self._file = open(filepath, 'a' if header else 'w', buffering=WRITE_BUFFER_BYTES, newline='')
+        if not header:
+            csv.writer(self._file).writerow(self.columns)
+
+    def write_batch(self, ohlcv):
+        if not ohlcv:
+            return
+        # Rows are numeric, so no quoting is needed: join the lines directly instead of going
+        # through csv.writer cell by cell, and format any UTC datetimes for the whole batch at once
+        if self._with_datetime:
+            stamps = np.array([candle[0] for candle in ohlcv], dtype='datetime64[ms]').astype('datetime64[s]')
+            datetimes = np.char.replace(np.datetime_as_string(stamps), 'T', ' ').tolist()
+        else:
+            datetimes = [''] * len(ohlcv)
+        lines = []
+        for candle, dt in zip(ohlcv, datetimes):
+            row = [*candle[:len(OHLCV_COLUMNS)], dt, '']
+            lines.append(','.join('' if row[i] is None else str(row[i]) for i in self._order))
+        # Same terminator csv.writer uses for the header
+        self._file.write('\r\n'.join(lines) + '\r\n')
+        self.rows += len(lines)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,59 @@
+import time
+import asyncio
+import logging
+import threading
+
+import ccxt
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """
+    Exponential backoff on consecutive rate-limit errors (418/429 -> ccxt.DDoSProtection).
+    The base pace comes from ccxt's own enableRateLimit throttle; this only adds delay
+    once Binance starts rejecting requests, and resets on the first success.
+    A call that is still rate limited after max_attempts tries re-raises the error.
+    """
+
+    def __init__(self, max_backoff_ms=30000, max_attempts=8):
+        self.max_backoff_ms = max_backoff_ms
+        self.max_attempts = max_attempts
+        self.successive_errors = 0
+        self._lock = threading.Lock()
+
+    def _on_error(self, e):
+        with self._lock:
+            self.successive_errors += 1
+            delay_ms = min(self.max_backoff_ms, 1000 * 2 ** (self.successive_errors - 3))
+        logger.warning(f"Rate limited ({self.successive_errors} in a row): {e}. Backing off {delay_ms / 1000:.2f}s")
+        return delay_ms / 1000
+
+    def _on_success(self):
+        if self.successive_errors:
+            with self._lock:
+                self.successive_errors = 0
+
+    def execute(self, func, *args, **kwargs):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = func(*args, **kwargs)
+            except ccxt.DDoSProtection as e:
+                if attempt == self.max_attempts:
+                    raise
+                time.sleep(self._on_error(e))
+                continue
+            self._on_success()
+            return result
+
+    async def execute_async(self, func, *args, **kwargs):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = await func(*args, **kwargs)
+            except ccxt.DDoSProtection as e:
+                if attempt == self.max_attempts:
+                    raise
+                await asyncio.sleep(self._on_error(e))
+                continue
+            self._on_success()
+            return result